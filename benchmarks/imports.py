@@ -0,0 +1,39 @@
+"""Benchmark of the time and memory it takes a worker to import the server.
+
+Run with: poetry run python benchmarks/imports.py
+"""
+
+import json
+import statistics
+import subprocess  # noqa: S404
+import sys
+
+# Run in a fresh interpreter, as a gunicorn worker importing the app:
+MEASURE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from static_rdf_server import create_app
+seconds = time.perf_counter() - start
+heavy = [m for m in ["rdflib", "pathvalidate"] if m in sys.modules]
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": seconds, "rss": rss, "heavy": heavy}))
+"""
+NUMBER = 10
+
+
+def measure() -> dict:
+    """Return import time, max RSS and heavy modules loaded, in a new process."""
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", MEASURE], capture_output=True, check=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+if __name__ == "__main__":
+    results = [measure() for _ in range(NUMBER)]
+    seconds = statistics.median(r["seconds"] for r in results)
+    rss = statistics.median(r["rss"] for r in results)
+    print(
+        f"import static_rdf_server: {seconds * 1000:.1f} ms, max RSS {rss / 1024:.1f} MiB"
+    )
+    print(f"heavy modules loaded: {', '.join(results[0]['heavy']) or 'none'}")
@@ -0,0 +1,45 @@
+"""Microbenchmark of content negotiation, with and without the cache.
+
+Run with: poetry run python benchmarks/negotiation.py
+"""
+
+import timeit
+
+from content_negotiation import decide_content_type, decide_language
+
+from static_rdf_server.utils.config import SUPPORTED_CONTENT_TYPES, SUPPORTED_LANGUAGES
+from static_rdf_server.utils.negotiation import (
+    negotiate_content_type,
+    negotiate_language,
+)
+
+# Typical headers from a browser, curl and a harvester:
+REQUESTS = [
+    (
+        ["text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"],
+        ["nb-NO,nb;q=0.9,no;q=0.8,nn;q=0.7,en-US;q=0.6,en;q=0.5"],
+    ),
+    (["*/*"], []),
+    (["text/turtle, application/ld+json;q=0.9, */*;q=0.1"], ["en"]),
+]
+NUMBER = 10000
+
+
+def uncached() -> None:
+    """Negotiate every request from scratch."""
+    for accept, accept_language in REQUESTS:
+        decide_content_type(accept, SUPPORTED_CONTENT_TYPES)
+        decide_language(accept_language, SUPPORTED_LANGUAGES)
+
+
+def cached() -> None:
+    """Negotiate every request through the cache."""
+    for accept, accept_language in REQUESTS:
+        negotiate_content_type(accept, SUPPORTED_CONTENT_TYPES)
+        negotiate_language(accept_language, SUPPORTED_LANGUAGES)
+
+
+if __name__ == "__main__":
+    for fn in [uncached, cached]:
+        seconds = timeit.timeit(fn, number=NUMBER)
+        print(f"{fn.__name__}: {seconds / NUMBER / len(REQUESTS) * 1e6:.2f} µs/request")
@@ -0,0 +1,44 @@
+"""Benchmark of path validation, against pathvalidate.
+
+Run with: poetry run python benchmarks/paths.py
+"""
+
+import timeit
+
+from pathvalidate import Platform, validate_filename, validate_filepath
+
+from static_rdf_server.utils.utils import valid_filename, valid_filepath
+
+# Paths validated when an ontology is requested and uploaded:
+FILEPATHS = [
+    "/srv/www/static-rdf-server/data/specifications",
+    "/srv/www/static-rdf-server/data/specifications/dcat-ap-no",
+    "/srv/www/static-rdf-server/data/specifications/dcat-ap-no/2.0.0",
+    "/srv/www/static-rdf-server/data/specifications/dcat-ap-no/dcat-ap-no-nb.html",
+    "images",
+]
+FILENAMES = ["dcat-ap-no.ttl", "dcat-ap-no-nb.html", "dcat-ap-no-uml.png"]
+NUMBER = 10000
+
+
+def with_pathvalidate() -> None:
+    """Validate with pathvalidate."""
+    for path in FILEPATHS:
+        validate_filepath(path, Platform.LINUX)
+    for filename in FILENAMES:
+        validate_filename(filename, Platform.LINUX)
+
+
+def with_valid_filepath() -> None:
+    """Validate with valid_filepath and valid_filename."""
+    for path in FILEPATHS:
+        valid_filepath(path)
+    for filename in FILENAMES:
+        valid_filename(filename)
+
+
+if __name__ == "__main__":
+    count = len(FILEPATHS) + len(FILENAMES)
+    for fn in [with_pathvalidate, with_valid_filepath]:
+        seconds = timeit.timeit(fn, number=NUMBER)
+        print(f"{fn.__name__}: {seconds / NUMBER / count * 1e6:.2f} µs/path")
@@ -0,0 +1,75 @@
+"""Benchmark of loading a graph from its snapshot, against parsing its turtle.
+
+And of reading a page of a triple pattern fragment from the snapshot.
+
+Run with: poetry run python benchmarks/snapshot.py
+"""
+
+import glob
+import os
+import tempfile
+import timeit
+
+from rdflib import Graph, Literal, URIRef
+
+from static_rdf_server.utils.snapshot import dump_graph, GraphSnapshot, load_graph
+
+VOCABULARIES = sorted(glob.glob("tests/files/**/*.ttl", recursive=True))
+NUMBER = 100
+
+
+def generated_vocabulary(concepts: int) -> Graph:
+    """Return a vocabulary of concepts, each with a few labels."""
+    graph = Graph()
+    for i in range(concepts):
+        concept = URIRef(f"https://example.com/vocabulary/concept-{i}")
+        graph.add(
+            (
+                concept,
+                URIRef("http://www.w3.org/2004/02/skos/core#notation"),
+                Literal(i),
+            )
+        )
+        for language in ["nb", "nn", "en"]:
+            graph.add(
+                (
+                    concept,
+                    URIRef("http://www.w3.org/2004/02/skos/core#prefLabel"),
+                    Literal(f"Concept {i} ({language})", lang=language),
+                )
+            )
+    return graph
+
+
+def compare(name: str, turtle: bytes, number: int) -> None:
+    """Print the time to parse turtle, and to load the snapshot of its graph."""
+    graph = Graph().parse(data=turtle, format="turtle")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "graph.snapshot")
+        with open(path, "wb") as file:
+            file.write(dump_graph(graph))
+        size = os.path.getsize(path)
+        parse = timeit.timeit(
+            lambda: Graph().parse(data=turtle, format="turtle"), number=number
+        )
+        load = timeit.timeit(lambda: load_graph(path), number=number)
+        # A page of a triple pattern fragment, of the triples with a predicate:
+        with GraphSnapshot(path) as snapshot:
+            predicate = snapshot.match([None, None, None], 0, 1)[1][0][1]
+            fragment = timeit.timeit(
+                lambda: snapshot.match([None, predicate, None], 0, 100),
+                number=number,
+            )
+    print(
+        f"{name}: {len(graph)} triples, turtle {len(turtle)} B, snapshot {size} B, "
+        f"parse {parse / number * 1000:.2f} ms, load {load / number * 1000:.2f} ms "
+        f"({parse / load:.1f}x), fragment page {fragment / number * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    for path in VOCABULARIES:
+        with open(path, "rb") as file:
+            compare(path, file.read(), NUMBER)
+    turtle = generated_vocabulary(10000).serialize(format="turtle", encoding="utf-8")
+    compare("generated vocabulary", turtle, 3)
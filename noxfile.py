@@ -6,7 +6,7 @@ import nox
 from nox_poetry import Session, session
 
 package = "app"
-locations = "static_rdf_server", "tests", "noxfile.py"
+locations = "static_rdf_server", "tests", "benchmarks", "noxfile.py"
 nox.options.envdir = ".cache"
 nox.options.reuse_existing_virtualenvs = True
 nox.options.stop_on_first_error = False
@@ -28,6 +28,7 @@ def unit_tests(session: Session) -> None:
     session.install(
         "pytest",
         "pytest-asyncio",
+        "pyfakefs",
         "requests",
     )
     session.run(
@@ -75,6 +76,7 @@ def contract_tests(session: Session) -> None:
         "pytest",
         "pytest-docker",
         "pytest-aiohttp",
+        "pyfakefs",
         "requests",
     )
     session.run(
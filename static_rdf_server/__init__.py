@@ -1,3 +1,14 @@
 """Package for server."""
 
-from .app import create_app
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    """Return create_app, importing the app on first use."""
+    # Not imported with the package, so that a conversion process, which
+    # imports the conversion module only, does not load the app as well:
+    if name == "create_app":
+        from .app import create_app
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
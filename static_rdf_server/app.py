@@ -1,5 +1,7 @@
 """Module for server."""
 
+import asyncio
+import contextlib
 import logging
 import os
 from typing import Any
@@ -10,14 +12,28 @@ from dotenv import load_dotenv
 
 from .routes import (
     delete_ontology,
+    get_fragment,
+    get_metrics,
     get_ontology,
+    get_ontology_serialization,
     get_ontology_type,
     get_slash,
     ping,
     put_ontology,
     put_ontology_type,
     ready,
+    SERIALIZATION_EXTENSIONS,
+    set_cache_metrics,
 )
+from .utils.cache import RepresentationCache, SingleFlight
+from .utils.conversion import ConversionEngine
+from .utils.index import OntologyIndex
+from .utils.metrics import count_response_bytes, Metrics, metrics_middleware
+from .utils.profiling import Profiler, profiling_middleware
+from .utils.timing import server_timing_middleware
+from .utils.trash import Trash
+from .utils.warmup import Warmup
+from .utils.watcher import invalidate, Watcher
 
 load_dotenv()
 LOGGING_LEVEL = os.getenv("LOGGING_LEVEL", "INFO")
@@ -26,6 +42,45 @@ CLIENT_MAX_SIZE = int(os.getenv("CLIENT_MAX_SIZE", 4 * 1024**3))
 SERVER_ROOT = os.getenv("SERVER_ROOT", "/srv/www/static-rdf-server")
 DATA_ROOT = os.getenv("DATA_ROOT", os.path.join(SERVER_ROOT, "data"))
 STATIC_ROOT = os.getenv("STATIC_ROOT", os.path.join(SERVER_ROOT, "static"))
+# Must be on the same filesystem as DATA_ROOT and STATIC_ROOT:
+STAGING_ROOT = os.getenv("STAGING_ROOT", os.path.join(SERVER_ROOT, "staging"))
+# Seconds between checks for changes written by other workers:
+INDEX_CHECK_INTERVAL = float(os.getenv("INDEX_CHECK_INTERVAL", 1))
+TRASH_ROOT = os.getenv("TRASH_ROOT", os.path.join(SERVER_ROOT, "trash"))
+# Files per second removed from the trash, per worker:
+TRASH_REMOVAL_RATE = int(os.getenv("TRASH_REMOVAL_RATE", 1000))
+# Per worker, should leave room within the memory limit of the deployment:
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", 16 * 1024**2))
+# Per worker, each conversion process holds a whole graph in memory:
+CONVERSION_WORKERS = int(os.getenv("CONVERSION_WORKERS", 1))
+CONVERSION_TIMEOUT = float(os.getenv("CONVERSION_TIMEOUT", 60))
+# An upload is converted to every serialization, should be in sync with nginx.conf:
+UPLOAD_CONVERSION_TIMEOUT = float(os.getenv("UPLOAD_CONVERSION_TIMEOUT", 300))
+# Shared by the workers, should be emptied when the server starts:
+METRICS_DIR = os.getenv("METRICS_DIR", None)
+# Seconds between writes of the metrics of a worker to METRICS_DIR:
+METRICS_WRITE_INTERVAL = 5
+PROFILE_ROOT = os.getenv("PROFILE_ROOT", os.path.join(SERVER_ROOT, "profiles"))
+# Number of profiles kept, the oldest are removed:
+PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION", 100))
+# Tells clients how the time of a request is spent, so it is off by default:
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+# Warms up the caches of a worker before it reports ready:
+WARMUP = os.getenv("WARMUP", "false").lower() == "true"
+# Seconds after which a worker reports ready, warm or not:
+WARMUP_BUDGET = float(os.getenv("WARMUP_BUDGET", 60))
+# File listing the ontologies to warm up, one type/ontology[/version] per line:
+WARMUP_HOT_SET = os.getenv("WARMUP_HOT_SET", None)
+# Watches DATA_ROOT for changes made outside the server, e.g. a restore:
+WATCH = os.getenv("WATCH", "false").lower() == "true"
+# Seconds without changes before a burst of changes is handled:
+WATCH_DELAY = float(os.getenv("WATCH_DELAY", 1))
+# Seconds between scans of DATA_ROOT, if inotify is not available:
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", 10))
+# Internal nginx location serving DATA_ROOT, if files should be sent by nginx:
+ACCEL_REDIRECT_LOCATION = os.getenv("ACCEL_REDIRECT_LOCATION", None)
+# Triples in a page of a triple pattern fragment:
+FRAGMENT_PAGE_SIZE = int(os.getenv("FRAGMENT_PAGE_SIZE", 100))
 DEFAULT_LANGUAGE = "nb"
 
 
@@ -35,28 +90,50 @@ async def create_app() -> web.Application:
     origins = [origin.strip() for origin in origins]
     allow_all = "*" in origins
 
-    app = web.Application(
-        client_max_size=CLIENT_MAX_SIZE,
-        middlewares=[
-            cors_middleware(
-                allow_all=allow_all,
-                origins=None if allow_all else origins,
-                allow_methods=["GET"],
-                allow_headers=["*"],
-            ),
-            error_middleware(),  # default error handler for whole application
-        ],
-    )
+    middlewares = [
+        metrics_middleware,
+        cors_middleware(
+            allow_all=allow_all,
+            origins=None if allow_all else origins,
+            allow_methods=["GET"],
+            allow_headers=["*"],
+        ),
+    ]
+    # Outside the error handler, so that error responses are timed as well:
+    if SERVER_TIMING:
+        middlewares.append(server_timing_middleware)
+    middlewares += [
+        error_middleware(),  # default error handler for whole application
+        profiling_middleware,
+    ]
+
+    app = web.Application(client_max_size=CLIENT_MAX_SIZE, middlewares=middlewares)
     # Set up logging
     logging.basicConfig(level=LOGGING_LEVEL)
     logging.getLogger("chardet.charsetprober").setLevel(LOGGING_LEVEL)
 
+    # Set up metrics:
+    app.on_response_prepare.append(count_response_bytes)
+
     # Set up routes:
     app.router.add_get("/ready", ready)
     app.router.add_get("/ping", ping)
+    app.router.add_get("/metrics", get_metrics)
     app.router.add_get("/", get_slash)
     app.router.add_get("/{ontology_type}", get_ontology_type)
     app.router.add_put("/{ontology_type}", put_ontology_type)
+    # Before the negotiated routes, which would match as well:
+    extensions = "|".join(SERIALIZATION_EXTENSIONS)
+    app.router.add_get(
+        f"/{{ontology_type}}/{{ontology}}.{{extension:{extensions}}}",
+        get_ontology_serialization,
+    )
+    app.router.add_get(
+        f"/{{ontology_type}}/{{ontology}}/{{version}}.{{extension:{extensions}}}",
+        get_ontology_serialization,
+    )
+    app.router.add_get("/{ontology_type}/{ontology}/fragments", get_fragment)
+    app.router.add_get("/{ontology_type}/{ontology}/{version}/fragments", get_fragment)
     app.router.add_get("/{ontology_type}/{ontology}", get_ontology)
     app.router.add_get("/{ontology_type}/{ontology}/{version}", get_ontology)
     app.router.add_put("/{ontology_type}/{ontology}", put_ontology)
@@ -66,14 +143,72 @@ async def create_app() -> web.Application:
 
     async def app_context(app: Any) -> Any:
         # Set up context:
+        app["CLIENT_MAX_SIZE"] = CLIENT_MAX_SIZE
         app["SERVER_ROOT"] = SERVER_ROOT
         app["DATA_ROOT"] = DATA_ROOT
         app["STATIC_ROOT"] = STATIC_ROOT
+        app["STAGING_ROOT"] = STAGING_ROOT
+        app["ACCEL_REDIRECT_LOCATION"] = ACCEL_REDIRECT_LOCATION
+        app["FRAGMENT_PAGE_SIZE"] = FRAGMENT_PAGE_SIZE
+        app["ONTOLOGY_INDEX"] = OntologyIndex(
+            DATA_ROOT,
+            os.path.join(SERVER_ROOT, "index-generation"),
+            INDEX_CHECK_INTERVAL,
+        )
+        app["TRASH"] = Trash(TRASH_ROOT, TRASH_REMOVAL_RATE)
         app["DEFAULT_LANGUAGE"] = DEFAULT_LANGUAGE
+        app["METRICS"] = Metrics(METRICS_DIR)
+        app["REPRESENTATION_CACHE"] = RepresentationCache(CACHE_MAX_SIZE)
+        app["SINGLE_FLIGHT"] = SingleFlight()
+        app["PROFILER"] = Profiler(PROFILE_ROOT, PROFILE_RETENTION)
+        app["CONVERSION_ENGINE"] = ConversionEngine(
+            CONVERSION_WORKERS,
+            CONVERSION_TIMEOUT,
+            app["METRICS"],
+            UPLOAD_CONVERSION_TIMEOUT,
+        )
+        app["WARMUP"] = Warmup(WARMUP, WARMUP_BUDGET, WARMUP_HOT_SET)
+
+        tasks = [
+            asyncio.create_task(app["TRASH"].reap()),
+            asyncio.create_task(
+                app["WARMUP"].run(
+                    app["ONTOLOGY_INDEX"],
+                    app["REPRESENTATION_CACHE"],
+                    app["CONVERSION_ENGINE"],
+                )
+            ),
+        ]
+        if METRICS_DIR:
+            tasks.append(asyncio.create_task(write_metrics(app)))
+        if WATCH:
+            watcher = Watcher(
+                DATA_ROOT,
+                lambda paths: invalidate(
+                    app["ONTOLOGY_INDEX"], app["REPRESENTATION_CACHE"], paths
+                ),
+                WATCH_DELAY,
+                WATCH_POLL_INTERVAL,
+            )
+            tasks.append(asyncio.create_task(watcher.watch()))
 
         yield
 
-        pass
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        app["CONVERSION_ENGINE"].shutdown()
+
+    async def write_metrics(app: Any) -> None:
+        # Other workers read the metrics of this worker from METRICS_DIR:
+        while True:
+            await asyncio.sleep(METRICS_WRITE_INTERVAL)
+            set_cache_metrics(app)
+            try:
+                app["METRICS"].write()
+            except OSError as e:
+                logging.error(f"Could not write metrics: {e}")
 
     app.cleanup_ctx.append(app_context)
 
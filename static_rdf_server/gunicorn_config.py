@@ -2,8 +2,11 @@
 
 import logging
 import multiprocessing
+import os
 from os import environ as env
+import shutil
 import sys
+import tempfile
 from typing import Any
 
 from dotenv import load_dotenv
@@ -23,6 +26,17 @@ threads = 2 * multiprocessing.cpu_count()
 logging_level = str(LOGGING_LEVEL)
 accesslog = "-"
 
+# The workers share their metrics through files in this folder:
+env.setdefault(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "static-rdf-server-metrics")
+)
+
+
+def on_starting(server: Any) -> None:
+    """Remove the metrics of workers from an earlier run."""
+    shutil.rmtree(env["METRICS_DIR"], ignore_errors=True)
+
+
 # Need to override the logger to remove healthcheck (ping) from accesslog
 
 
@@ -52,6 +66,7 @@ class CustomGunicornLogger(glogging.Logger):
         access_logger = logging.getLogger("gunicorn.access")
         access_logger.addFilter(PingFilter())
         access_logger.addFilter(ReadyFilter())
+        access_logger.addFilter(MetricsFilter())
 
         root_logger = logging.getLogger()
         root_logger.setLevel(logging_level)
@@ -91,4 +106,12 @@ class ReadyFilter(logging.Filter):
         return "GET /ready" not in record.getMessage()
 
 
+class MetricsFilter(logging.Filter):
+    """Custom Metrics Filter class."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Filter function."""
+        return "GET /metrics" not in record.getMessage()
+
+
 logger_class = CustomGunicornLogger
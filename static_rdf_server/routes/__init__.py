@@ -1,6 +1,14 @@
 """Package for routes."""
 
-from .ontology import delete_ontology, get_ontology, put_ontology
+from .fragments import get_fragment
+from .metrics import get_metrics, set_cache_metrics
+from .ontology import (
+    delete_ontology,
+    get_ontology,
+    get_ontology_serialization,
+    put_ontology,
+    SERIALIZATION_EXTENSIONS,
+)
 from .ontology_type import get_ontology_type, put_ontology_type
 from .ping import ping
 from .ready import ready
@@ -0,0 +1,176 @@
+"""Module for triple pattern fragments route."""
+
+import asyncio
+import logging
+import os
+import time
+from typing import List
+
+from aiohttp import hdrs, web
+from content_negotiation import NoAgreeableContentTypeError
+from multidict import MultiDict
+from yarl import URL
+
+from static_rdf_server.utils.conversion import Conversion, ConversionTimeoutException
+from static_rdf_server.utils.negotiation import negotiate_content_type
+from static_rdf_server.utils.snapshot import (
+    fresh_snapshot,
+    GraphSnapshot,
+    ntriples_term,
+    parse_term,
+    SnapshotFormatException,
+    store_snapshot,
+)
+from static_rdf_server.utils.timing import add_timing, timing
+from static_rdf_server.utils.utils import valid_filepath
+
+# The triples are written as N-Triples, which is turtle as well:
+FRAGMENT_CONTENT_TYPES = ["text/turtle", "application/n-triples"]
+PATTERN = ["subject", "predicate", "object"]
+HYDRA = "http://www.w3.org/ns/hydra/core#"
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+VOID = "http://rdfs.org/ns/void#"
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+
+async def get_fragment(request: web.Request) -> web.Response:
+    """Return a page of the triples of the ontology matching the triple pattern."""
+    data_root = request.app["DATA_ROOT"]
+    index = request.app["ONTOLOGY_INDEX"]
+    ontology_type = request.match_info["ontology_type"]
+    ontology = request.match_info["ontology"]
+    version = request.match_info.get("version", None)
+
+    try:
+        content_type = negotiate_content_type(
+            request.headers.getall(hdrs.ACCEPT, []),
+            supported_content_types=FRAGMENT_CONTENT_TYPES,
+        )
+    except NoAgreeableContentTypeError as e:
+        raise web.HTTPNotAcceptable() from e
+
+    try:
+        pattern = [parse_term(request.query.get(name, "")) for name in PATTERN]
+        page = int(request.query.get("page", "1"))
+        if page < 1:
+            raise ValueError(f"Page {page} is not positive.")
+    except ValueError as e:
+        raise web.HTTPBadRequest(reason=f"Triple pattern is not valid: {e}") from e
+
+    ontology_path = os.path.join(
+        data_root, *filter(None, [ontology_type, ontology, version])
+    )
+    path = os.path.join(ontology_path, f"{ontology}.ttl")
+    if not valid_filepath(f"{path}"):
+        raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+    if index.stat(path) is None:
+        raise web.HTTPNotFound() from None
+
+    # Only the matching rows of the indexes are read, not the whole graph:
+    page_size = request.app["FRAGMENT_PAGE_SIZE"]
+    snapshot = await load_snapshot(request, path)
+    try:
+        with timing(request, "lookup"):
+            count, triples = snapshot.match(pattern, (page - 1) * page_size, page_size)
+    finally:
+        snapshot.close()
+
+    lines = [" ".join(ntriples_term(term) for term in triple) for triple in triples]
+    lines += hydra_controls(request.url, page, page_size, count)
+    return web.Response(
+        text="".join(f"{line} .\n" for line in lines),
+        content_type=content_type,
+        charset="utf-8",
+        headers=MultiDict([(hdrs.VARY, hdrs.ACCEPT)]),
+    )
+
+
+async def load_snapshot(request: web.Request, path: str) -> GraphSnapshot:
+    """Return the snapshot of the turtle file at path, made now if not stored."""
+    index = request.app["ONTOLOGY_INDEX"]
+    snapshot_path = fresh_snapshot(index, path)
+    if snapshot_path:
+        try:
+            return GraphSnapshot(snapshot_path)
+        except (OSError, SnapshotFormatException) as e:
+            logging.warning(f"Making a snapshot of {path}, could not load it: {e}")
+
+    # Stored before snapshots were, we make one and store it next to the turtle
+    # file, as an upload does, so that it is made once only:
+    st = index.stat(path) or os.stat(path)
+
+    try:
+        conversion = await request.app["SINGLE_FLIGHT"].run(
+            (path, "snapshot", st.st_mtime_ns),
+            lambda: make_snapshot(request, path, st),
+        )
+    except ConversionTimeoutException as e:
+        raise web.HTTPServiceUnavailable(reason=str(e)) from e
+    # Timed for every request waiting for it, not only the one starting it:
+    add_timing(request, "read", conversion.read_seconds)
+    add_timing(request, "parse", conversion.parse_seconds)
+    if conversion.snapshot is None:
+        raise web.HTTPNotFound(reason="Ontology has no triple pattern fragments.")
+    return GraphSnapshot(conversion.snapshot)
+
+
+async def make_snapshot(
+    request: web.Request, path: str, st: os.stat_result
+) -> Conversion:
+    """Return the turtle file at path converted, with its snapshot, and store it."""
+    index = request.app["ONTOLOGY_INDEX"]
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        file_content = f.read()
+    read_seconds = time.perf_counter() - start
+    conversion = await request.app["CONVERSION_ENGINE"].convert(
+        file_content, "text/turtle", [], snapshot=True
+    )
+    if conversion.snapshot is not None:
+        try:
+            with timing(request, "write"):
+                await asyncio.to_thread(store_snapshot, path, conversion.snapshot, st)
+            index.refresh(os.path.dirname(path))
+        except OSError as e:
+            logging.warning(f"Could not store the snapshot of {path}: {e}")
+    return conversion._replace(read_seconds=read_seconds)
+
+
+def hydra_controls(url: URL, page: int, page_size: int, count: int) -> List[str]:
+    """Return the metadata and controls of a page of a fragment, as triples."""
+    fragments = url.with_query(None)
+    pattern = {name: url.query[name] for name in PATTERN if url.query.get(name)}
+
+    def page_url(page: int) -> str:
+        return f"<{fragments.with_query({**pattern, 'page': page})}>"
+
+    dataset = f"<{fragments.with_fragment('dataset')}>"
+    # The metadata is about the fragment as it was asked for:
+    fragment = f"<{url}>"
+    total = f'"{count}"^^<{XSD_INTEGER}>'
+    lines = [
+        f"{dataset} <{RDF}type> <{VOID}Dataset>",
+        f"{dataset} <{RDF}type> <{HYDRA}Collection>",
+        f"{dataset} <{VOID}subset> {fragment}",
+        f"{dataset} <{HYDRA}search> _:tpf-search",
+        f'_:tpf-search <{HYDRA}template> "{fragments}{{?subject,predicate,object}}"',
+        f"_:tpf-search <{HYDRA}variableRepresentation> <{HYDRA}ExplicitRepresentation>",
+    ]
+    for name in PATTERN:
+        lines += [
+            f"_:tpf-search <{HYDRA}mapping> _:tpf-{name}",
+            f'_:tpf-{name} <{HYDRA}variable> "{name}"',
+            f"_:tpf-{name} <{HYDRA}property> <{RDF}{name}>",
+        ]
+    lines += [
+        f"{fragment} <{RDF}type> <{HYDRA}PartialCollectionView>",
+        f"{fragment} <{VOID}triples> {total}",
+        f"{fragment} <{HYDRA}totalItems> {total}",
+        f'{fragment} <{HYDRA}itemsPerPage> "{page_size}"^^<{XSD_INTEGER}>',
+        f"{fragment} <{HYDRA}first> {page_url(1)}",
+    ]
+    if page > 1:
+        lines.append(f"{fragment} <{HYDRA}previous> {page_url(page - 1)}")
+    if page * page_size < count:
+        lines.append(f"{fragment} <{HYDRA}next> {page_url(page + 1)}")
+    return lines
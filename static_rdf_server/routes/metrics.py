@@ -0,0 +1,35 @@
+"""Module for metrics route."""
+
+from typing import Any
+
+from aiohttp import hdrs, web
+
+from static_rdf_server.utils.negotiation import negotiation_stats
+
+
+async def get_metrics(request: web.Request) -> web.Response:
+    """Return the metrics of all workers in the Prometheus text format."""
+    set_cache_metrics(request.app)
+    body = request.app["METRICS"].render()
+    return web.Response(
+        body=body.encode("utf-8"),
+        headers={hdrs.CONTENT_TYPE: "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
+def set_cache_metrics(app: Any) -> None:
+    """Copy the counters of the caches to the metrics."""
+    metrics = app["METRICS"]
+    representation_stats = app["REPRESENTATION_CACHE"].stats()
+    for cache, stats in [
+        ("representation", representation_stats),
+        ("negotiation", negotiation_stats()),
+    ]:
+        metrics.set_counter("cache_hits_total", {"cache": cache}, stats["hits"])
+        metrics.set_counter("cache_misses_total", {"cache": cache}, stats["misses"])
+    # The negotiation caches are bounded as well, but do not count evictions:
+    metrics.set_counter(
+        "cache_evictions_total",
+        {"cache": "representation"},
+        representation_stats["evictions"],
+    )
@@ -1,32 +1,54 @@
 """Module for ontology route."""
 
+import asyncio
 import logging
 import os
-import shutil
-from typing import List, Optional
-from urllib.parse import unquote
+import tempfile
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote
 
 from aiohttp import BodyPartReader, hdrs, web
-from multidict import MultiDict
-from rdflib import Graph
+from aiohttp.abc import AbstractStreamWriter
+from multidict import CIMultiDict, MultiDict
 
-from static_rdf_server.utils import (
+from static_rdf_server.utils.cache import CacheKey
+from static_rdf_server.utils.config import (
+    ENCODING_EXTENSIONS,
+    EXTENSION_MAP,
+    LANGUAGE_FILE_SUFFIX,
+    RDF_CONTENT_TYPES,
+    SUPPORTED_CONTENT_TYPES,
+    SUPPORTED_LANGUAGES,
+)
+from static_rdf_server.utils.conversion import (
+    Conversion,
+    ConversionTimeoutException,
+    NotValidFileContentException,
+)
+from static_rdf_server.utils.profiling import profile_path
+from static_rdf_server.utils.snapshot import convert_stored
+from static_rdf_server.utils.timing import add_timing, timing
+from static_rdf_server.utils.utils import (
+    compress,
     ContentTypeNotSupportedException,
     decide_content_and_extension,
-    NotValidFileContentException,
+    decide_content_encodings,
+    is_not_modified,
+    is_precondition_failed,
+    representation_headers,
     rewrite_links,
     valid_content_type,
-    valid_file_content,
     valid_file_extension,
+    valid_filename,
     valid_filepath,
 )
-from static_rdf_server.utils.config import (
-    LANGUAGE_FILE_SUFFIX,
-    RDF_CONTENT_TYPES,
-    SUPPORTED_CONTENT_TYPES,
-    SUPPORTED_LANGUAGES,
-)
-from static_rdf_server.utils.utils import valid_filename
+
+# Extensions of the URLs addressing a serialization directly:
+SERIALIZATION_EXTENSIONS: Dict[str, str] = {
+    EXTENSION_MAP[content_type]: content_type for content_type in RDF_CONTENT_TYPES
+}
+# Size of the chunks read from the request when streaming a part to disk:
+STREAM_CHUNK_SIZE = 2**16
 
 
 async def put_ontology(request: web.Request) -> web.Response:  # noqa: C901
@@ -53,166 +75,186 @@ async def put_ontology(request: web.Request) -> web.Response:  # noqa: C901
         if version
         else os.path.join(data_root, ontology_type, ontology)
     )
-    if not valid_filepath(f"{destination}"):
-        raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-    # Check if ontology-type exist. Otherwise return 404:
     ontology_type_folder = os.path.join(data_root, ontology_type)
-    if not valid_filepath(f"{ontology_type_folder}"):
-        raise web.HTTPBadRequest(reason="Ontology-type path is not valid.") from None
-    if not os.path.exists(ontology_type_folder):
-        raise web.HTTPNotFound(
-            reason=f"Ontology-type {ontology_type} does not exist."
-        ) from None
-
-    if os.path.exists(destination):
-        status_code = 204
-    else:
-        status_code = 201
-
-    # Processing parts:
-    reader = await request.multipart()
-    while True:
-        part = await reader.next()
-        if not part:
-            break
-
-        if isinstance(part, BodyPartReader):
-            logging.debug(f"part.name {part.name}.")
-            content_language: str = ""
-
-            # Validate headers:
-            content_type: Optional[str] = None
-            try:
-                content_type = part.headers[hdrs.CONTENT_TYPE]
-                if not (await valid_content_type(content_type)):
-                    raise web.HTTPUnsupportedMediaType(
-                        reason=f"Not supported content-type '{content_type}'."
-                    )
-            except KeyError:
-                raise web.HTTPBadRequest(
-                    reason="Content-Type header must be given."
-                ) from None
-
-            # For html we check that the content-language header is set:
-            if "text/html" in content_type:
-                if not part.headers.get(hdrs.CONTENT_LANGUAGE):
-                    raise web.HTTPBadRequest(
-                        reason="For html-content, Content-Language header must be given."
-                    )
-                content_language = part.headers[hdrs.CONTENT_LANGUAGE]
+    with timing(request, "validate"):
+        if not valid_filepath(f"{destination}"):
+            raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+        if not valid_filepath(f"{ontology_type_folder}"):
+            raise web.HTTPBadRequest(
+                reason="Ontology-type path is not valid."
+            ) from None
+        # The URL of the version would be taken by the triple pattern fragments:
+        if version == "fragments":
+            raise web.HTTPBadRequest(reason="Version is not valid.") from None
 
-            # Validate filename extension:
-            extension: str = ""
-            if part.filename:
-                file_subfolder_path = part.filename.split("/")
-                if len(file_subfolder_path) > 2:
-                    raise web.HTTPBadRequest(
-                        reason="Ontology file path includes more than one subfolder."
-                    ) from None
-                elif len(file_subfolder_path) == 2 and not valid_filepath(
-                    file_subfolder_path[0]
-                ):
-                    raise web.HTTPBadRequest(
-                        reason="Ontology subfolder is not valid."
-                    ) from None
+    # Check if ontology-type exist. Otherwise return 404:
+    with timing(request, "lookup"):
+        if not os.path.exists(ontology_type_folder):
+            raise web.HTTPNotFound(
+                reason=f"Ontology-type {ontology_type} does not exist."
+            ) from None
+
+        if os.path.exists(destination):
+            status_code = 204
+        else:
+            status_code = 201
 
-                if not valid_filename(f"{file_subfolder_path[-1]}"):
+    # Parts are stored in a staging folder, and published when all are valid:
+    os.makedirs(request.app["STAGING_ROOT"], exist_ok=True)
+    staging_folder = tempfile.mkdtemp(dir=request.app["STAGING_ROOT"])
+    staged_data_root = os.path.join(staging_folder, "data")
+    staged_static_root = os.path.join(staging_folder, "static")
+    try:
+        # Processing parts:
+        reader = await request.multipart()
+        while True:
+            part = await reader.next()
+            if not part:
+                break
+
+            if isinstance(part, BodyPartReader):
+                logging.debug(f"part.name {part.name}.")
+                content_language: str = ""
+
+                # Validate headers:
+                content_type: Optional[str] = None
+                try:
+                    content_type = part.headers[hdrs.CONTENT_TYPE]
+                    if not (await valid_content_type(content_type)):
+                        raise web.HTTPUnsupportedMediaType(
+                            reason=f"Not supported content-type '{content_type}'."
+                        )
+                except KeyError:
                     raise web.HTTPBadRequest(
-                        reason="Ontology file is not valid."
+                        reason="Content-Type header must be given."
                     ) from None
 
-                extension = part.filename.split(".")[-1]
-                if not (await valid_file_extension(extension)):
-                    raise web.HTTPBadRequest(
-                        reason=f"Not supported file-extension '{extension}'."
+                # For html we check that the content-language header is set:
+                if "text/html" in content_type:
+                    if not part.headers.get(hdrs.CONTENT_LANGUAGE):
+                        raise web.HTTPBadRequest(
+                            reason="For html-content, Content-Language header must be given."
+                        )
+                    content_language = part.headers[hdrs.CONTENT_LANGUAGE]
+
+                # Validate filename extension:
+                with timing(request, "validate"):
+                    extension: str = ""
+                    if part.filename:
+                        file_subfolder_path = part.filename.split("/")
+                        if len(file_subfolder_path) > 2:
+                            raise web.HTTPBadRequest(
+                                reason="Ontology file path includes more than one subfolder."
+                            ) from None
+                        elif len(file_subfolder_path) == 2 and not valid_filepath(
+                            file_subfolder_path[0]
+                        ):
+                            raise web.HTTPBadRequest(
+                                reason="Ontology subfolder is not valid."
+                            ) from None
+
+                        if not valid_filename(f"{file_subfolder_path[-1]}"):
+                            raise web.HTTPBadRequest(
+                                reason="Ontology file is not valid."
+                            ) from None
+
+                        extension = part.filename.split(".")[-1]
+                        if not (await valid_file_extension(extension)):
+                            raise web.HTTPBadRequest(
+                                reason=f"Not supported file-extension '{extension}'."
+                            )
+
+                # Static files are streamed to disk, without holding them in memory:
+                is_static = content_type not in RDF_CONTENT_TYPES + ["text/html"]
+                if is_static and not is_encoded(part):
+                    path = await prepare_path(
+                        staged_static_root,
+                        ontology_type,
+                        ontology,
+                        version,
+                        part.filename,
+                        extension,
+                        content_language,
+                    )
+                    logging.debug(f"Streaming to path: {path}.")
+                    with timing(request, "write"):
+                        size = await write_part(
+                            part, path, request.app["CLIENT_MAX_SIZE"]
+                        )
+                    count_part(request, content_type, size)
+                    continue
+
+                # Read the file:
+                with timing(request, "read"):
+                    try:
+                        ontology_file = await part.read(decode=False)
+                    except ValueError:  # pragma: no cover
+                        raise web.HTTPBadRequest(
+                            reason=f'Ontology file "{part.filename}" could not be read.'
+                        ) from None
+                    ontology_file_decoded: bytes = part.decode(ontology_file)
+                count_part(request, content_type, len(ontology_file))
+
+                # For html-files We need to rewrite links to sub-folders:
+                if "text/html" in content_type:
+                    with timing(request, "rewrite"):
+                        ontology_file_decoded = await rewrite_links(
+                            ontology_file_decoded,
+                            data_root,
+                            ontology_type,
+                            ontology,
+                            version,
+                        )
+
+                # For RDF we check the content, and store it in every serialization
+                # from the same parse. The turtle file is the main one:
+                if content_type in RDF_CONTENT_TYPES:
+                    path = await prepare_path(
+                        staged_data_root,
+                        ontology_type,
+                        ontology,
+                        version,
+                        part.filename,
+                        "ttl",
+                        content_language,
                     )
+                    await write_rdf(
+                        request,
+                        path,
+                        ontology_file_decoded,
+                        content_type,
+                        part.filename,
+                    )
+                    continue
+
+                # Write file to path:
+                with timing(request, "write"):
+                    path = await prepare_path(
+                        staged_static_root if is_static else staged_data_root,
+                        ontology_type,
+                        ontology,
+                        version,
+                        part.filename,
+                        extension,
+                        content_language,
+                    )
+                    logging.debug(f"Writing to path: {path}.")
+                    if is_static:
+                        with open(path, "wb") as file:
+                            file.write(ontology_file_decoded)
+                    else:
+                        await write_representation(path, ontology_file_decoded)
+
+        with timing(request, "write"):
+            publish(staged_data_root, data_root, remove_stale_compressed=True)
+            publish(staged_static_root, static_root)
+        request.app["ONTOLOGY_INDEX"].refresh(
+            os.path.join(data_root, ontology_type, ontology)
+        )
+    finally:
+        request.app["TRASH"].move(staging_folder)
 
-            # Read the file:
-            try:
-                ontology_file = await part.read(decode=False)
-            except ValueError:  # pragma: no cover
-                raise web.HTTPBadRequest(
-                    reason=f'Ontology file "{part.filename}" could not be read.'
-                ) from None
-
-            # Check the content of the file:
-            ontology_file_decoded: bytes
-            try:
-                ontology_file_decoded = part.decode(ontology_file)
-                await valid_file_content(
-                    content_type, RDF_CONTENT_TYPES, ontology_file_decoded
-                )
-            except NotValidFileContentException as e:
-                raise web.HTTPBadRequest(
-                    reason=f'Ontology file "{part.filename}" has not valid content.'
-                ) from e
-
-            # For html-files We need to rewrite links to sub-folders:
-            if "text/html" in content_type:
-                ontology_file_decoded = await rewrite_links(
-                    ontology_file_decoded, data_root, ontology_type, ontology, version
-                )
-
-            # For other RDF serializations than turtle, we need to convert to turtle:
-            if content_type in RDF_CONTENT_TYPES and content_type != "text/turtle":
-                ontology_file_decoded = bytes(
-                    Graph()
-                    .parse(data=ontology_file_decoded, format=content_type)
-                    .serialize(format="turtle"),
-                    "utf-8",
-                )
-                extension = "ttl"
-
-            # Decide and create ontology path:
-            if content_type in RDF_CONTENT_TYPES + ["text/html"]:
-                ontology_path = (
-                    os.path.join(data_root, ontology_type, ontology, version)
-                    if version
-                    else os.path.join(data_root, ontology_type, ontology)
-                )
-            else:
-                ontology_path = (
-                    os.path.join(static_root, ontology_type, ontology, version)
-                    if version
-                    else os.path.join(static_root, ontology_type, ontology)
-                )
-            if not valid_filepath(f"{ontology_path}"):
-                raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-            if not os.path.exists(ontology_path):
-                os.makedirs(ontology_path)
-
-            # Decide sub-folders:
-            sub_folders: List[str]
-            if part.filename:
-                _filename = unquote(part.filename)
-                sub_folders = _filename.split(os.sep)
-                for folder in sub_folders[:-1]:
-                    ontology_path = os.path.join(ontology_path, folder)
-
-            # Create sub-folders:
-            if not valid_filepath(f"{ontology_path}"):
-                raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-            if not os.path.exists(ontology_path):
-                os.makedirs(ontology_path)
-
-            # For html and RDF create filename:
-            filename: str
-            if part.filename and extension not in ["html", "ttl"]:
-                _filename = unquote(part.filename)
-                filename = _filename.split(os.sep)[-1]
-            else:
-                if len(content_language) > 0:
-                    filename = f"{ontology}-{LANGUAGE_FILE_SUFFIX[content_language]}.{extension}"
-                else:
-                    filename = f"{ontology}.{extension}"
-
-            # Write file to path:
-            path = os.path.join(str(ontology_path), filename)
-            logging.debug(f"Writing to path: {path}.")
-            if not valid_filepath(f"{ontology_path}"):
-                raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-            with open(path, "wb") as file:
-                file.write(ontology_file_decoded)
+    request.app["REPRESENTATION_CACHE"].invalidate(ontology_type, ontology, version)
 
     if status_code == 201:
         headers = MultiDict([(hdrs.LOCATION, f"{ontology_type}/{ontology}")])
@@ -221,10 +263,191 @@ async def put_ontology(request: web.Request) -> web.Response:  # noqa: C901
     return web.Response(status=status_code, headers=headers)
 
 
-async def get_ontology(request: web.Request) -> web.Response:  # noqa: C901
+async def write_rdf(
+    request: web.Request,
+    path: str,
+    data: bytes,
+    content_type: str,
+    filename: Optional[str],
+) -> None:
+    """Write data, and every other RDF serialization of it, next to the turtle path."""
+    ontology = request.match_info["ontology"]
+    paths = {
+        _content_type: os.path.join(
+            os.path.dirname(path), f"{ontology}.{EXTENSION_MAP[_content_type]}"
+        )
+        for _content_type in RDF_CONTENT_TYPES
+    }
+    with timing(request, "write"):
+        logging.debug(f"Writing to path: {paths[content_type]}.")
+        with open(paths[content_type], "wb") as file:
+            file.write(data)
+
+    # The conversion process writes the serializations, and only returns timings:
+    try:
+        conversion = await request.app["CONVERSION_ENGINE"].convert_file(
+            paths[content_type],
+            content_type,
+            {c: p for c, p in paths.items() if c != content_type},
+            profile_path(request, "conversion"),
+            path,
+        )
+    except NotValidFileContentException as e:
+        raise web.HTTPBadRequest(
+            reason=f'Ontology file "{filename}" has not valid content.'
+        ) from e
+    except ConversionTimeoutException as e:
+        raise web.HTTPServiceUnavailable(reason=str(e)) from e
+    logging.debug(f"Parsed {conversion.triples} triples.")
+    add_timing(request, "read", conversion.read_seconds)
+    add_timing(request, "parse", conversion.parse_seconds)
+    add_timing(request, "serialize", sum(conversion.serialize_seconds.values()))
+
+    with timing(request, "write"):
+        for _path in paths.values():
+            await asyncio.to_thread(compress_file, _path)
+
+
+async def prepare_path(
+    root: str,
+    ontology_type: str,
+    ontology: str,
+    version: Optional[str],
+    part_filename: Optional[str],
+    extension: str,
+    content_language: str,
+) -> str:
+    """Return the path to store the file of a part at, creating its folders."""
+    ontology_path = (
+        os.path.join(root, ontology_type, ontology, version)
+        if version
+        else os.path.join(root, ontology_type, ontology)
+    )
+    if not valid_filepath(f"{ontology_path}"):
+        raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+
+    # Decide sub-folders:
+    sub_folders: List[str]
+    if part_filename:
+        _filename = unquote(part_filename)
+        sub_folders = _filename.split(os.sep)
+        for folder in sub_folders[:-1]:
+            ontology_path = os.path.join(ontology_path, folder)
+
+    # Create folders:
+    if not valid_filepath(f"{ontology_path}"):
+        raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+    if not os.path.exists(ontology_path):
+        os.makedirs(ontology_path)
+
+    # For html and RDF create filename:
+    filename: str
+    if part_filename and extension not in ["html", "ttl"]:
+        _filename = unquote(part_filename)
+        filename = _filename.split(os.sep)[-1]
+    else:
+        if len(content_language) > 0:
+            filename = (
+                f"{ontology}-{LANGUAGE_FILE_SUFFIX[content_language]}.{extension}"
+            )
+        else:
+            filename = f"{ontology}.{extension}"
+
+    return os.path.join(str(ontology_path), filename)
+
+
+def is_encoded(part: BodyPartReader) -> bool:
+    """Return True if the part must be decoded as a whole before it is stored."""
+    content_encoding = part.headers.get(hdrs.CONTENT_ENCODING, "identity")
+    transfer_encoding = part.headers.get(hdrs.CONTENT_TRANSFER_ENCODING, "binary")
+    return content_encoding.lower() != "identity" or transfer_encoding.lower() not in [
+        "binary",
+        "8bit",
+        "7bit",
+    ]
+
+
+def count_part(request: web.Request, content_type: str, size: int) -> None:
+    """Count the uploaded part and its size in the metrics."""
+    labels = {"content_type": content_type}
+    request.app["METRICS"].inc("upload_parts_total", labels)
+    request.app["METRICS"].inc("upload_part_bytes_total", labels, size)
+
+
+async def write_part(part: BodyPartReader, path: str, max_size: int) -> int:
+    """Stream the part to path, and return its size."""
+    size = 0
+    with open(path, "wb") as file:
+        while chunk := await part.read_chunk(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise web.HTTPRequestEntityTooLarge(max_size=max_size, actual_size=size)
+            file.write(chunk)
+    return size
+
+
+async def write_representation(path: str, data: bytes) -> None:
+    """Write data to path, together with a precompressed file per content-coding."""
+    with open(path, "wb") as file:
+        file.write(data)
+    await asyncio.to_thread(compress_file, path)
+
+
+def compress_file(path: str) -> None:
+    """Write a precompressed file per content-coding next to the file at path."""
+    with open(path, "rb") as file:
+        compressed = compress(file.read())
+    for content_coding, content in compressed.items():
+        with open(f"{path}.{ENCODING_EXTENSIONS[content_coding]}", "wb") as file:
+            file.write(content)
+
+
+def publish(staged_root: str, root: str, remove_stale_compressed: bool = False) -> None:
+    """Move the staged files into root, replacing the published files.
+
+    Every file is renamed into place, so that a reader sees either the old or the
+    new file, never a partial one. The files are not replaced together, though:
+    while publishing, a reader may get e.g. the new turtle file and the old html
+    file, or the new file uncompressed where the compressed file is not yet in
+    place. Requires the same filesystem as root.
+
+    Args:
+        staged_root: The folder of the staged files.
+        root: The folder of the published files.
+        remove_stale_compressed: Whether to remove the published compressed
+            files of the staged files, also where none are staged.
+    """
+    for folder, _, filenames in os.walk(staged_root):
+        target_folder = os.path.join(root, os.path.relpath(folder, staged_root))
+        os.makedirs(target_folder, exist_ok=True)
+        compressed = {
+            f"{filename}.{extension}"
+            for filename in filenames
+            for extension in ENCODING_EXTENSIONS.values()
+        }.intersection(filenames)
+        identity = [filename for filename in filenames if filename not in compressed]
+        if remove_stale_compressed:
+            # Removed before the files are replaced, as an old compressed file
+            # must never be sent in place of new content:
+            for filename in identity:
+                for extension in ENCODING_EXTENSIONS.values():
+                    compressed_path = os.path.join(
+                        target_folder, f"{filename}.{extension}"
+                    )
+                    if os.path.exists(compressed_path):
+                        os.remove(compressed_path)
+        # The compressed files last, so that they are not sent for an old file:
+        for filename in identity + sorted(compressed):
+            os.replace(
+                os.path.join(folder, filename), os.path.join(target_folder, filename)
+            )
+
+
+async def get_ontology(request: web.Request) -> web.StreamResponse:  # noqa: C901
     """Return default response."""
     data_root = request.app["DATA_ROOT"]
     default_language = request.app["DEFAULT_LANGUAGE"]
+    index = request.app["ONTOLOGY_INDEX"]
     ontology_type = request.match_info["ontology_type"]
     ontology = request.match_info["ontology"]
     version: Optional[str] = None
@@ -245,21 +468,28 @@ async def get_ontology(request: web.Request) -> web.Response:  # noqa: C901
     )
 
     logging.debug(f"Looking for ontology_path: {ontology_path}")
-    if not valid_filepath(f"{ontology_path}"):
-        raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-    if not os.path.exists(ontology_path):
-        raise web.HTTPNotFound()
+    with timing(request, "validate"):
+        if not valid_filepath(f"{ontology_path}"):
+            raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+    with timing(request, "lookup"):
+        if index.stat(ontology_path) is None:
+            raise web.HTTPNotFound()
 
     # Then we check headers to decide what representation to look for:
-    try:
-        content_type, content_language, extension = await decide_content_and_extension(
-            request.headers.getall(hdrs.ACCEPT, []),
-            SUPPORTED_CONTENT_TYPES,
-            request.headers.getall(hdrs.ACCEPT_LANGUAGE, []),
-            SUPPORTED_LANGUAGES,
-        )
-    except ContentTypeNotSupportedException as e:
-        raise web.HTTPNotAcceptable(reason=str(e)) from e
+    with timing(request, "negotiate"):
+        try:
+            (
+                content_type,
+                content_language,
+                extension,
+            ) = await decide_content_and_extension(
+                request.headers.getall(hdrs.ACCEPT, []),
+                SUPPORTED_CONTENT_TYPES,
+                request.headers.getall(hdrs.ACCEPT_LANGUAGE, []),
+                SUPPORTED_LANGUAGES,
+            )
+        except ContentTypeNotSupportedException as e:
+            raise web.HTTPNotAcceptable(reason=str(e)) from e
 
     # We finally try to get the corresponding representation.
     # For html the filename is ontology-language.html
@@ -267,45 +497,244 @@ async def get_ontology(request: web.Request) -> web.Response:  # noqa: C901
     if content_type == "text/html" and len(content_language) > 0:
         filename = f"{ontology}-{LANGUAGE_FILE_SUFFIX[content_language]}.{extension}"
     else:
-        filename = f"{ontology}.ttl"
+        filename = f"{ontology}.{extension}"
 
     # Try to get exact match on language:
     full_path = os.path.join(ontology_path, filename)
     logging.debug(f"Looking for full_path: {full_path}")
-    if not valid_filepath(f"{full_path}"):
-        raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-    if os.path.exists(full_path):
-        with open(full_path, "r") as f:
-            file_content = f.read()
-
-        # For RDF we convert to the requested format:
-        if content_type in RDF_CONTENT_TYPES:
-            body = Graph().parse(data=file_content).serialize(format=content_type)
-        else:
-            body = file_content
-
-        headers = MultiDict([(hdrs.CONTENT_LANGUAGE, content_language)])
-        return web.Response(text=body, headers=headers, content_type=content_type)
+    with timing(request, "validate"):
+        if not valid_filepath(f"{full_path}"):
+            raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+    with timing(request, "lookup"):
+        found = index.stat(full_path) is not None
+    if found:
+        return await file_response(request, full_path, content_type, content_language)
     else:
         logging.debug(f"Could not find full_path: {full_path}.")
 
+    # RDF stored without its serializations, we convert from turtle:
+    if content_type in RDF_CONTENT_TYPES:
+        full_path = os.path.join(ontology_path, f"{ontology}.ttl")
+        logging.debug(f"Looking for turtle full_path: {full_path}")
+        with timing(request, "validate"):
+            if not valid_filepath(f"{full_path}"):
+                raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+        with timing(request, "lookup"):
+            found = index.stat(full_path) is not None
+        if found:
+            key = (ontology_type, ontology, version, content_type)
+            return await converted_response(
+                request, full_path, key, content_type, content_language
+            )
+
     # For html-requests, if not found, we return the representation in the default langauge:
     if content_type == "text/html":
         filename = f"{ontology}-{default_language}.{extension}"
         full_path = os.path.join(ontology_path, filename)
         logging.debug(f"Looking for fall-back full_path: {full_path}")
-        if not valid_filepath(f"{full_path}"):
-            raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
-        if os.path.exists(full_path):
-            with open(full_path, "r") as f:
-                body = f.read()
-            headers = MultiDict([(hdrs.CONTENT_LANGUAGE, default_language)])
-            return web.Response(text=body, headers=headers, content_type=content_type)
+        with timing(request, "validate"):
+            if not valid_filepath(f"{full_path}"):
+                raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+        with timing(request, "lookup"):
+            found = index.stat(full_path) is not None
+        if found:
+            return await file_response(
+                request, full_path, content_type, default_language
+            )
 
     # If we are here, the ontology does exist, but there is no suitable representation:
     raise web.HTTPNotAcceptable() from None
 
 
+async def get_ontology_serialization(request: web.Request) -> web.StreamResponse:
+    """Return the RDF serialization given by the extension, without negotiation."""
+    data_root = request.app["DATA_ROOT"]
+    default_language = request.app["DEFAULT_LANGUAGE"]
+    index = request.app["ONTOLOGY_INDEX"]
+    ontology_type = request.match_info["ontology_type"]
+    ontology = request.match_info["ontology"]
+    version = request.match_info.get("version")
+    extension = request.match_info["extension"]
+    content_type = SERIALIZATION_EXTENSIONS[extension]
+    logging.debug(f"Got request for {ontology_type}/{ontology}/{version}.{extension}")
+
+    # An ontology or version named with the extension, e.g. stored before these
+    # routes were added, is still served at its URL:
+    name = f"{version or ontology}.{extension}"
+    named_path = os.path.join(
+        data_root, ontology_type, *([ontology, name] if version else [name])
+    )
+    with timing(request, "lookup"):
+        named = index.stat(named_path) is not None
+    if named:
+        request.match_info["version" if version else "ontology"] = name
+        return await get_ontology(request)
+
+    ontology_path = (
+        os.path.join(data_root, ontology_type, ontology, version)
+        if version
+        else os.path.join(data_root, ontology_type, ontology)
+    )
+    full_path = os.path.join(ontology_path, f"{ontology}.{extension}")
+    with timing(request, "validate"):
+        if not valid_filepath(f"{full_path}"):
+            raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
+    with timing(request, "lookup"):
+        found = index.stat(full_path) is not None
+    if found:
+        return await file_response(
+            request, full_path, content_type, default_language, negotiated=False
+        )
+
+    # RDF stored without its serializations, we convert from turtle:
+    turtle_path = os.path.join(ontology_path, f"{ontology}.ttl")
+    with timing(request, "lookup"):
+        found = index.stat(turtle_path) is not None
+    if found:
+        key = (ontology_type, ontology, version, content_type)
+        return await converted_response(
+            request, turtle_path, key, content_type, default_language, negotiated=False
+        )
+    raise web.HTTPNotFound()
+
+
+class RepresentationFileResponse(web.StreamResponse):
+    """Class representing a response that sends a stored file with the headers given.
+
+    FileResponse picks a precompressed file and sets the ETag on its own, but the
+    file is chosen already, and the same file is sent in more than one representation.
+    """
+
+    def __init__(self, path: str, headers: CIMultiDict) -> None:
+        """Init the response with the path of the file to send."""
+        super().__init__(headers=headers)
+        self._path = path
+
+    async def prepare(self, request: web.BaseRequest) -> Optional[AbstractStreamWriter]:
+        """Send the headers and the file."""
+        if self.prepared:
+            return await super().prepare(request)
+        loop = asyncio.get_running_loop()
+        fobj = await loop.run_in_executor(None, open, self._path, "rb")
+        try:
+            count = os.fstat(fobj.fileno()).st_size
+            self.content_length = count
+            writer = await super().prepare(request)
+            if writer is not None and request.method != hdrs.METH_HEAD and count:
+                await writer.drain()
+                transport = request.transport
+                if transport is None:
+                    raise ConnectionResetError("Connection lost")
+                try:
+                    await loop.sendfile(transport, fobj, 0, count)
+                except NotImplementedError:
+                    # Not available for e.g. a TLS transport:
+                    while chunk := await loop.run_in_executor(
+                        None, fobj.read, STREAM_CHUNK_SIZE
+                    ):
+                        await writer.write(chunk)
+            await super().write_eof()
+            return writer
+        finally:
+            await loop.run_in_executor(None, fobj.close)
+
+
+async def file_response(
+    request: web.Request,
+    path: str,
+    content_type: str,
+    content_language: str,
+    negotiated: bool = True,
+) -> web.StreamResponse:
+    """Return a response that sends the stored file without reading it into memory."""
+    index = request.app["ONTOLOGY_INDEX"]
+    # Prefer a precompressed file, if the client accepts it:
+    content_encoding: Optional[str] = None
+    with timing(request, "lookup"):
+        for content_coding in decide_content_encodings(
+            request.headers.get(hdrs.ACCEPT_ENCODING, ""), list(ENCODING_EXTENSIONS)
+        ):
+            compressed_path = f"{path}.{ENCODING_EXTENSIONS[content_coding]}"
+            if index.stat(compressed_path):
+                path, content_encoding = compressed_path, content_coding
+                break
+
+        st = index.stat(path) or os.stat(path)
+    headers = representation_headers(
+        st, content_type, content_language, content_encoding, negotiated
+    )
+    if is_precondition_failed(request, headers):
+        return web.Response(status=412)
+    if is_not_modified(request, headers):
+        return web.Response(status=304, headers=headers)
+
+    headers[hdrs.CONTENT_TYPE] = f"{content_type}; charset=utf-8"
+    accel_redirect_location = request.app["ACCEL_REDIRECT_LOCATION"]
+    if accel_redirect_location:
+        # nginx sends the file instead, together with these headers:
+        relative_path = os.path.relpath(path, request.app["DATA_ROOT"])
+        headers["X-Accel-Redirect"] = (
+            f"{accel_redirect_location.rstrip('/')}/{quote(relative_path)}"
+        )
+        return web.Response(headers=headers)
+    return RepresentationFileResponse(path, headers=headers)
+
+
+async def converted_response(
+    request: web.Request,
+    path: str,
+    key: CacheKey,
+    content_type: str,
+    content_language: str,
+    negotiated: bool = True,
+) -> web.StreamResponse:
+    """Return a response with the turtle file at path converted to content_type."""
+    with timing(request, "lookup"):
+        st = request.app["ONTOLOGY_INDEX"].stat(path) or os.stat(path)
+    headers = representation_headers(
+        st, content_type, content_language, negotiated=negotiated
+    )
+    if is_precondition_failed(request, headers):
+        return web.Response(status=412)
+    if is_not_modified(request, headers):
+        return web.Response(status=304, headers=headers)
+
+    cache = request.app["REPRESENTATION_CACHE"]
+    validator = (st.st_mtime_ns, st.st_size)
+    # A profiled request converts on its own, so that the conversion is profiled:
+    profile = request.get("PROFILE")
+    body = None if profile else cache.get(key, validator)
+    if body is None:
+
+        async def convert() -> Conversion:
+            conversion = await convert_stored(
+                request.app["CONVERSION_ENGINE"],
+                request.app["ONTOLOGY_INDEX"],
+                path,
+                [content_type],
+                profile_path(request, "conversion"),
+            )
+            cache.put(key, validator, conversion.serializations[content_type])
+            return conversion
+
+        # Concurrent requests for the same representation share one conversion:
+        try:
+            conversion = await request.app["SINGLE_FLIGHT"].run(
+                (path, content_type, st.st_mtime_ns, profile), convert
+            )
+        except ConversionTimeoutException as e:
+            raise web.HTTPServiceUnavailable(reason=str(e)) from e
+        # Timed for every request waiting for it, not only the one starting it:
+        add_timing(request, "read", conversion.read_seconds)
+        add_timing(request, "parse", conversion.parse_seconds)
+        add_timing(request, "serialize", conversion.serialize_seconds[content_type])
+        body = conversion.serializations[content_type]
+
+    return web.Response(
+        body=body, headers=headers, content_type=content_type, charset="utf-8"
+    )
+
+
 async def delete_ontology(request: web.Request) -> web.Response:
     """Return default response."""
     api_key = request.headers.get("X-API-KEY", None)
@@ -342,7 +771,10 @@ async def delete_ontology(request: web.Request) -> web.Response:
     if not os.path.exists(ontology_path):
         raise web.HTTPNotFound()
 
-    shutil.rmtree(ontology_path)
+    # Moved to the trash at once, and removed in the background:
+    request.app["TRASH"].move(ontology_path)
+    request.app["ONTOLOGY_INDEX"].refresh(ontology_path)
+    request.app["REPRESENTATION_CACHE"].invalidate(ontology_type, ontology, version)
 
     # We also need to remove static files, if they exist:
     static_path = (
@@ -354,6 +786,6 @@ async def delete_ontology(request: web.Request) -> web.Response:
     if not valid_filepath(f"{static_path}"):
         raise web.HTTPBadRequest(reason="Ontology path is not valid.") from None
     if os.path.exists(static_path):
-        shutil.rmtree(static_path)
+        request.app["TRASH"].move(static_path)
 
     return web.Response(status=204)
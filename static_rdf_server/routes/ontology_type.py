@@ -1,24 +1,35 @@
 """Module for ontology route."""
 
+import asyncio
 import datetime
 import logging
 import os
+import re
 from textwrap import dedent
-from typing import Any, List, Tuple
+from typing import Any, AsyncIterator, List, Tuple
 
 from aiohttp import hdrs, web
-from content_negotiation import (
-    decide_content_type,
-    decide_language,
-    NoAgreeableContentTypeError,
-    NoAgreeableLanguageError,
-)
+from content_negotiation import NoAgreeableContentTypeError, NoAgreeableLanguageError
 from multidict import MultiDict
 
-from static_rdf_server.utils import valid_filepath
+from static_rdf_server.utils.conversion import (
+    ConversionTimeoutException,
+    NotValidFileContentException,
+)
+from static_rdf_server.utils.negotiation import (
+    negotiate_content_type,
+    negotiate_language,
+)
+from static_rdf_server.utils.snapshot import convert_stored
+from static_rdf_server.utils.utils import valid_filepath
 
-SUPPORTED_CONTENT_TYPES = ["text/html"]
+SUPPORTED_CONTENT_TYPES = ["text/html", "application/n-quads"]
 SUPPORTED_LANGUAGES = ["nb", "nn", "en"]
+RESERVED_ONTOLOGY_TYPES = ["metrics", "ping", "ready"]
+# Size of the chunks of N-Quads written to the response:
+NQUADS_CHUNK_SIZE = 2**16
+# The terms of a triple, where only a blank node has its label in the group:
+TERM = re.compile(r'<[^>]*>|"(?:[^"\\]|\\.)*"|_:([^\s.<"]+(?:\.[^\s.<"]+)*)')
 
 
 async def put_ontology_type(request: web.Request) -> web.Response:
@@ -36,24 +47,29 @@ async def put_ontology_type(request: web.Request) -> web.Response:
 
     if not valid_filepath(f"{destination}"):
         raise web.HTTPBadRequest(reason="Ontology-type path is not valid.") from None
+    # The URL of the ontology-type would be taken by a route of the server:
+    if ontology_type in RESERVED_ONTOLOGY_TYPES:
+        raise web.HTTPBadRequest(reason="Ontology-type is not valid.") from None
 
     if os.path.exists(destination):
         status_code = 204
     else:
         os.makedirs(destination)
+        request.app["ONTOLOGY_INDEX"].refresh(destination)
         status_code = 201
 
     headers = MultiDict([(hdrs.LOCATION, f"{ontology_type}")])
     return web.Response(status=status_code, headers=headers)
 
 
-async def get_ontology_type(request: web.Request) -> web.Response:
+async def get_ontology_type(request: web.Request) -> web.StreamResponse:
     """Should generate and return a list of ontologies in give ontology-type as a html-document."""
     data_root = request.app["DATA_ROOT"]
+    index = request.app["ONTOLOGY_INDEX"]
     ontology_type = request.match_info["ontology_type"]
 
     try:
-        content_type = decide_content_type(
+        content_type = negotiate_content_type(
             request.headers.getall(hdrs.ACCEPT, []),
             supported_content_types=SUPPORTED_CONTENT_TYPES,
         )
@@ -61,7 +77,7 @@ async def get_ontology_type(request: web.Request) -> web.Response:
         raise web.HTTPNotAcceptable() from e
 
     try:
-        content_language = decide_language(
+        content_language = negotiate_language(
             request.headers.getall(hdrs.ACCEPT_LANGUAGE, []),
             supported_languages=SUPPORTED_LANGUAGES,
         )
@@ -74,19 +90,23 @@ async def get_ontology_type(request: web.Request) -> web.Response:
         raise web.HTTPBadRequest(reason="Ontology-type path is not valid.") from None
 
     # If the ontology-type does not exist, return 404:
-    if not os.path.exists(ontology_type_path):
+    if index.stat(ontology_type_path) is None:
         headers = MultiDict(
             [(hdrs.CONTENT_TYPE, "text/html"), (hdrs.CONTENT_LANGUAGE, "en")]
         )
         body: str = await generate_html_not_found()
         return web.Response(text=body, headers=headers, status=404)
 
+    # Every ontology of the type, each in a graph of its own:
+    if content_type == "application/n-quads":
+        return await nquads_response(request, ontology_type, ontology_type_path)
+
     # Read content of data-root, and map all folders to a list of ontologies:
-    ontology_names: List[Any] = next(os.walk(ontology_type_path), (None, [], None))[1]
+    ontology_names: List[Any] = index.folders(ontology_type_path)
     ontologies: List[Tuple[str, str]] = []
     for o in ontology_names:
         ontology_path = os.path.join(ontology_type_path, o)
-        ts_epoch = os.path.getmtime(ontology_path)
+        ts_epoch = index.stat(ontology_path).st_mtime
         last_modified = datetime.datetime.fromtimestamp(ts_epoch).strftime(
             "%Y-%m-%d %H:%M:%S"
         )
@@ -100,6 +120,99 @@ async def get_ontology_type(request: web.Request) -> web.Response:
     return web.Response(text=body, headers=headers, status=200)
 
 
+async def nquads_response(
+    request: web.Request, ontology_type: str, ontology_type_path: str
+) -> web.StreamResponse:
+    """Return a response streaming the ontologies of the type as N-Quads."""
+    index = request.app["ONTOLOGY_INDEX"]
+    response = web.StreamResponse(
+        headers=MultiDict([(hdrs.VARY, f"{hdrs.ACCEPT}, {hdrs.ACCEPT_LANGUAGE}")])
+    )
+    response.content_type = "application/n-quads"
+    response.charset = "utf-8"
+    await response.prepare(request)
+
+    for number, ontology in enumerate(sorted(index.folders(ontology_type_path))):
+        ontology_path = os.path.join(ontology_type_path, ontology)
+        graph = request.url.with_path(f"/{ontology_type}/{ontology}").with_query(None)
+        # Blank nodes are local to their graph, so their labels must differ:
+        prefix = f"g{number}_"
+        chunk: List[str] = []
+        size = 0
+        async for line in ntriples_lines(request, ontology_path, ontology):
+            # A triple is made a quad by adding the graph before the final dot:
+            triple = line.strip()
+            if not triple or triple.startswith("#"):
+                continue
+            if "_:" in triple:
+                triple = _prefix_blank_nodes(triple, prefix)
+            quad = f"{triple[:-1].rstrip()} <{graph}> .\n"
+            chunk.append(quad)
+            size += len(quad)
+            if size >= NQUADS_CHUNK_SIZE:
+                await response.write("".join(chunk).encode("utf-8"))
+                chunk, size = [], 0
+        await response.write("".join(chunk).encode("utf-8"))
+
+    await response.write_eof()
+    return response
+
+
+async def ntriples_lines(
+    request: web.Request, ontology_path: str, ontology: str
+) -> AsyncIterator[str]:
+    """Yield the lines of the ontology as N-Triples, read from disk if stored."""
+    index = request.app["ONTOLOGY_INDEX"]
+    ntriples_path = os.path.join(ontology_path, f"{ontology}.nt")
+    if index.stat(ntriples_path):
+        async for line in _read_lines(ntriples_path):
+            yield line
+        return
+
+    # RDF stored without its serializations, we convert from turtle:
+    turtle_path = os.path.join(ontology_path, f"{ontology}.ttl")
+    if not index.stat(turtle_path):
+        return
+    try:
+        conversion = await convert_stored(
+            request.app["CONVERSION_ENGINE"],
+            index,
+            turtle_path,
+            ["application/n-triples"],
+        )
+    except (ConversionTimeoutException, NotValidFileContentException) as e:
+        logging.warning(f"Could not convert {turtle_path}: {e}")
+        return
+    for line in (
+        conversion.serializations["application/n-triples"].decode().splitlines()
+    ):
+        yield line
+
+
+async def _read_lines(path: str) -> AsyncIterator[str]:
+    # A chunk at a time, and off the event loop, so that a large file is neither
+    # held in memory nor blocks other requests:
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(None, open, path, "rb")
+    try:
+        rest = b""
+        while chunk := await loop.run_in_executor(None, file.read, NQUADS_CHUNK_SIZE):
+            *lines, rest = (rest + chunk).split(b"\n")
+            for line in lines:
+                yield line.decode("utf-8")
+        if rest:
+            yield rest.decode("utf-8")
+    finally:
+        await loop.run_in_executor(None, file.close)
+
+
+def _prefix_blank_nodes(triple: str, prefix: str) -> str:
+    # Literals and IRIs are matched as well, so that their contents are kept:
+    return TERM.sub(
+        lambda m: f"_:{prefix}{m.group(1)}" if m.group(1) else m.group(0), triple
+    )
+
+
 async def generate_html_document(
     ontology_type: str, ontologies: List[Tuple[str, str]], lang: str
 ) -> str:
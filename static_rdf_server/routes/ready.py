@@ -13,4 +13,11 @@ async def ready(request: web.Request) -> web.Response:
         raise web.HTTPInternalServerError(
             reason=f'Ready fails: SERVER_ROOT "{server_root}" does not exist.'
         ) from None
+
+    # Traffic should only be routed to a worker with warm caches:
+    warmup = request.app["WARMUP"]
+    if not warmup.done:
+        raise web.HTTPServiceUnavailable(
+            reason=f"Warming up: {warmup.warmed}/{warmup.total} ontologies."
+        ) from None
     return web.Response(text="OK")
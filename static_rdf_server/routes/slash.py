@@ -1,17 +1,16 @@
 """Module for slash route."""
 
-import os
 from typing import Any, Dict, List
 
 from aiohttp import hdrs, web
-from content_negotiation import (
-    decide_content_type,
-    decide_language,
-    NoAgreeableContentTypeError,
-    NoAgreeableLanguageError,
-)
+from content_negotiation import NoAgreeableContentTypeError, NoAgreeableLanguageError
 from multidict import MultiDict
 
+from static_rdf_server.utils.negotiation import (
+    negotiate_content_type,
+    negotiate_language,
+)
+
 SUPPORTED_CONTENT_TYPES = ["text/html"]
 SUPPORTED_LANGUAGES = ["nb", "nn", "en"]
 
@@ -19,7 +18,7 @@ SUPPORTED_LANGUAGES = ["nb", "nn", "en"]
 async def get_slash(request: web.Request) -> web.Response:
     """Should generate and return a list of ontology-types as a html-document."""
     try:
-        content_type = decide_content_type(
+        content_type = negotiate_content_type(
             request.headers.getall(hdrs.ACCEPT, []),
             supported_content_types=SUPPORTED_CONTENT_TYPES,
         )
@@ -27,7 +26,7 @@ async def get_slash(request: web.Request) -> web.Response:
         raise web.HTTPNotAcceptable() from e
 
     try:
-        content_language = decide_language(
+        content_language = negotiate_language(
             request.headers.getall(hdrs.ACCEPT_LANGUAGE, []),
             supported_languages=SUPPORTED_LANGUAGES,
         )
@@ -37,7 +36,7 @@ async def get_slash(request: web.Request) -> web.Response:
     data_root = request.app["DATA_ROOT"]
 
     # Read content of data-root, and map all folders to a list of ontology_types:
-    ontology_types: List[Any] = next(os.walk(data_root), (None, [], None))[1]
+    ontology_types: List[Any] = request.app["ONTOLOGY_INDEX"].folders(data_root)
 
     # Generate html with the list as body:
     body = await generate_html_document(ontology_types, content_language)
@@ -1,12 +1 @@
 """Package for routes."""
-
-from .utils import (
-    ContentTypeNotSupportedException,
-    decide_content_and_extension,
-    NotValidFileContentException,
-    rewrite_links,
-    valid_content_type,
-    valid_file_content,
-    valid_file_extension,
-    valid_filepath,
-)
@@ -0,0 +1,126 @@
+"""Module for the in-memory cache of representations."""
+
+import asyncio
+from collections import OrderedDict
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+# (ontology_type, ontology, version, content_type), the body of an RDF
+# serialization does not depend on the negotiated language:
+CacheKey = Tuple[str, str, Optional[str], str]
+
+T = TypeVar("T")
+
+
+class RepresentationCache:
+    """Least recently used cache of response bodies, bounded by size in bytes.
+
+    Every entry is stored together with a validator, e.g. mtime and size of the
+    file the body was produced from. An entry is only returned if the caller
+    presents the same validator, so that a body is never served after the
+    source has been changed by another worker.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Create a cache holding at most max_size bytes of bodies."""
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[CacheKey, Tuple[Any, bytes]] = OrderedDict()
+
+    def get(self, key: CacheKey, validator: Any) -> Optional[bytes]:
+        """Return the cached body, or None if not cached or stale."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != validator:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: CacheKey, validator: Any, body: bytes) -> None:
+        """Store body, evicting the least recently used entries to make room."""
+        if len(body) > self.max_size:
+            logging.debug(f"Not caching {key}: {len(body)} bytes exceeds cache size.")
+            return
+        self._remove(key)
+        self._entries[key] = (validator, body)
+        self.size += len(body)
+        while self.size > self.max_size:
+            evicted_key, (_, evicted_body) = self._entries.popitem(last=False)
+            self.size -= len(evicted_body)
+            self.evictions += 1
+            logging.debug(f"Evicted {evicted_key} from representation cache.")
+
+    def invalidate(
+        self,
+        ontology_type: str,
+        ontology: Optional[str] = None,
+        version: Optional[str] = None,
+    ) -> int:
+        """Remove entries of the ontology-type, ontology or version, as given."""
+        keys = [
+            key
+            for key in self._entries
+            if key[0] == ontology_type
+            and (ontology is None or key[1] == ontology)
+            and (version is None or key[2] == version)
+        ]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters and current size of the cache."""
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class SingleFlight:
+    """Class sharing one computation among concurrent callers with the same key.
+
+    The computation runs as a task of its own, so that it is not cancelled
+    when the caller that started it goes away. When it is done, the key is
+    released, and a result or error is never given to later callers.
+    """
+
+    def __init__(self) -> None:
+        """Create with no computations in flight."""
+        self.shared = 0
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of fn, or of the computation in flight for key."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Retrieve the error, which is not logged if every caller has gone away:
+        if not task.cancelled():
+            task.exception()
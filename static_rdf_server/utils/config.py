@@ -7,6 +7,7 @@ RDF_CONTENT_TYPES: List[str] = [
     "application/rdf+xml",
     "application/ld+json",
     "text/n3",
+    "application/n-triples",
 ]
 
 STATIC_CONTENT_TYPES: List[str] = [
@@ -30,6 +31,7 @@ SUPPORTED_CONTENT_TYPES: List[str] = (
 
 SUPPORTED_EXTENSIONS: List[str] = [
     "ttl",
+    "nt",
     "html",
     "png",
     "pdf",
@@ -47,9 +49,17 @@ SUPPORTED_EXTENSIONS: List[str] = [
 EXTENSION_MAP: Dict[str, str] = {
     "text/html": "html",
     "text/turtle": "ttl",
-    "application/ld+json": "json",
-    "application/rdf+xml": "xml",
+    "application/ld+json": "jsonld",
+    "application/rdf+xml": "rdf",
     "text/n3": "n3",
+    "application/n-triples": "nt",
+}
+
+# Precompressed files are stored next to the file with these extensions,
+# in order of preference:
+ENCODING_EXTENSIONS: Dict[str, str] = {
+    "br": "br",
+    "gzip": "gz",
 }
 
 # Default language is first in list:
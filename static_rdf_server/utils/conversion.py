@@ -0,0 +1,297 @@
+"""Module for parsing and serializing RDF in worker processes."""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import os
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    TYPE_CHECKING,
+    TypeVar,
+)
+
+# A conversion process imports this module, not the server, so it must not
+# import aiohttp, which would take memory in every such process:
+from static_rdf_server.utils.snapshot import (
+    dump_graph,
+    load_graph,
+    SnapshotFormatException,
+    store_snapshot,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from rdflib import Graph
+
+    from static_rdf_server.utils.metrics import Metrics
+
+T = TypeVar("T")
+
+
+class ConversionTimeoutException(Exception):
+    """Class representing the conversion timeout exception."""
+
+    pass
+
+
+class NotValidFileContentException(Exception):
+    """Class representing the not valid file content exception."""
+
+    pass
+
+
+def parse_rdf(data: bytes, content_type: str) -> "Graph":
+    """Return the graph parsed from data."""
+    # Imported here, so that only the conversion processes load rdflib:
+    from rdflib import Graph
+    from rdflib.exceptions import ParserError
+
+    try:
+        return Graph().parse(data=data, format=content_type)
+    except (ParserError, SyntaxError, UnicodeDecodeError) as e:
+        raise NotValidFileContentException(str(e)) from e
+
+
+class Conversion(NamedTuple):
+    """Class representing an RDF document converted from a single parse."""
+
+    serializations: Dict[str, bytes]
+    triples: int
+    parse_seconds: float
+    serialize_seconds: Dict[str, float]
+    read_seconds: float = 0.0
+    snapshot: Optional[bytes] = None
+
+
+def convert_rdf(
+    data: bytes, content_type: str, content_types: List[str], snapshot: bool = False
+) -> Conversion:
+    """Parse data once, validating it, and serialize it to each of the content-types."""
+    start = time.perf_counter()
+    graph = parse_rdf(data, content_type)
+    parse_seconds = time.perf_counter() - start
+
+    conversion = _serialize(graph, content_types, parse_seconds)
+    if not snapshot:
+        return conversion
+    try:
+        return conversion._replace(snapshot=dump_graph(graph))
+    except SnapshotFormatException as e:
+        logging.warning(f"Could not snapshot graph: {e}")
+        return conversion
+
+
+def convert_rdf_file(
+    path: str,
+    content_type: str,
+    paths: Dict[str, str],
+    turtle_path: Optional[str] = None,
+) -> Conversion:
+    """Parse the file at path once, validating it, and write it to paths by type."""
+    # Written by the worker process, so that the serializations are not sent
+    # back to the server. The conversion returned holds no serialization:
+    start = time.perf_counter()
+    with open(path, "rb") as file:
+        data = file.read()
+    read_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = parse_rdf(data, content_type)
+    parse_seconds = time.perf_counter() - start
+    # Not kept in memory together with the serializations:
+    del data
+
+    serialize_seconds: Dict[str, float] = {}
+    for _content_type, _path in paths.items():
+        start = time.perf_counter()
+        graph.serialize(destination=_path, format=_content_type, encoding="utf-8")
+        serialize_seconds[_content_type] = time.perf_counter() - start
+
+    # Stored next to the turtle file, if given:
+    if turtle_path:
+        try:
+            store_snapshot(turtle_path, dump_graph(graph), os.stat(turtle_path))
+        except SnapshotFormatException as e:
+            logging.warning(f"Could not snapshot graph: {e}")
+    return Conversion({}, len(graph), parse_seconds, serialize_seconds, read_seconds)
+
+
+def convert_snapshot(path: str, content_types: List[str]) -> Conversion:
+    """Load the graph from the snapshot at path, and serialize it."""
+    start = time.perf_counter()
+    graph = load_graph(path)
+    return _serialize(graph, content_types, time.perf_counter() - start)
+
+
+def _serialize(
+    graph: "Graph", content_types: List[str], parse_seconds: float
+) -> Conversion:
+    serializations: Dict[str, bytes] = {}
+    serialize_seconds: Dict[str, float] = {}
+    for _content_type in content_types:
+        start = time.perf_counter()
+        serializations[_content_type] = graph.serialize(
+            format=_content_type, encoding="utf-8"
+        )
+        serialize_seconds[_content_type] = time.perf_counter() - start
+    return Conversion(serializations, len(graph), parse_seconds, serialize_seconds)
+
+
+class ConversionEngine:
+    """Class running the RDF conversions in a pool of worker processes.
+
+    The event loop only awaits the result, so that a large ontology does not
+    block other requests. When a conversion exceeds the timeout, the worker
+    processes are stopped and the pool is recreated, so that later conversions
+    do not queue behind it. Uploads are converted to every serialization, and
+    are given upload_timeout.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout: float,
+        metrics: Optional["Metrics"] = None,
+        upload_timeout: Optional[float] = None,
+    ) -> None:
+        """Create the pool, worker processes are started on first use."""
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.upload_timeout = upload_timeout or timeout
+        self.metrics = metrics
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # The server runs threads, which do not go well with fork:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def run(
+        self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None
+    ) -> T:
+        """Run fn with args in a worker process and return the result."""
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.timeout
+        executor = self._executor
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, fn, *args), timeout
+            )
+        except asyncio.TimeoutError as e:
+            logging.warning("A conversion timed out, restarting the pool.")
+            self._restart(executor)
+            raise ConversionTimeoutException(
+                f"Conversion did not finish within {timeout} seconds."
+            ) from e
+        except BrokenProcessPool as e:
+            if executor is not self._executor:
+                # Stopped together with a conversion that timed out:
+                raise ConversionTimeoutException(
+                    "Conversion was stopped, together with one timed out."
+                ) from e
+            logging.error("A conversion worker process died, restarting the pool.")
+            self._restart(executor)
+            raise
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        # Concurrent conversions in a broken pool must only restart it once:
+        if executor is self._executor:
+            self._executor = self._create_executor()
+            _stop(executor)
+
+    async def convert(
+        self,
+        data: bytes,
+        content_type: str,
+        content_types: List[str],
+        profile_path: Optional[str] = None,
+        snapshot: bool = False,
+    ) -> Conversion:
+        """Return data converted to the content-types, raise if not valid RDF."""
+        return await self._convert(
+            content_type,
+            profile_path,
+            convert_rdf,
+            data,
+            content_type,
+            content_types,
+            snapshot,
+        )
+
+    async def convert_file(
+        self,
+        path: str,
+        content_type: str,
+        paths: Dict[str, str],
+        profile_path: Optional[str] = None,
+        turtle_path: Optional[str] = None,
+    ) -> Conversion:
+        """Write the file at path converted to paths by type, raise if not valid RDF."""
+        return await self._convert(
+            content_type,
+            profile_path,
+            convert_rdf_file,
+            path,
+            content_type,
+            paths,
+            turtle_path,
+            timeout=self.upload_timeout,
+        )
+
+    async def convert_snapshot(
+        self,
+        path: str,
+        content_types: List[str],
+        profile_path: Optional[str] = None,
+    ) -> Conversion:
+        """Return the graph in the snapshot at path converted to the content-types."""
+        return await self._convert(
+            "snapshot", profile_path, convert_snapshot, path, content_types
+        )
+
+    async def _convert(
+        self,
+        source_format: str,
+        profile_path: Optional[str],
+        fn: Callable[..., Conversion],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Conversion:
+        if profile_path:
+            from static_rdf_server.utils.profiling import run_profiled
+
+            conversion = await self.run(
+                run_profiled, profile_path, fn, *args, timeout=timeout
+            )
+        else:
+            conversion = await self.run(fn, *args, timeout=timeout)
+        if self.metrics:
+            self.metrics.observe(
+                "rdf_parse_seconds", {"format": source_format}, conversion.parse_seconds
+            )
+            for _content_type, seconds in conversion.serialize_seconds.items():
+                self.metrics.observe(
+                    "rdf_serialize_seconds", {"format": _content_type}, seconds
+                )
+        return conversion
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, and the conversions they run."""
+        _stop(self._executor)
+
+
+def _stop(executor: ProcessPoolExecutor) -> None:
+    # A process would otherwise finish its conversion, however long it takes,
+    # and shutdown would block the event loop waiting for it:
+    for process in list(executor._processes.values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,174 @@
+"""Module for the in-memory index of the data root."""
+
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+
+class Folder(NamedTuple):
+    """Class representing an indexed folder, with its sub-folders and files."""
+
+    stat: os.stat_result
+    folders: Set[str]
+    files: Dict[str, os.stat_result]
+
+
+class OntologyIndex:
+    """Index of every folder and file in the data root, kept in memory.
+
+    Requests are routed by looking up the index, without touching the
+    filesystem. A worker updates its own index after writing, and bumps the
+    generation file so that other workers rebuild theirs. The generation file
+    is checked at most once per check_interval seconds. The rebuild scans the
+    data root in a thread, and the old index is used until it is done.
+    """
+
+    def __init__(
+        self, data_root: str, generation_path: str, check_interval: float
+    ) -> None:
+        """Create an index of data_root, built on first use."""
+        self.data_root = data_root
+        self.generation_path = generation_path
+        self.check_interval = check_interval
+        self.builds = 0
+        self._folders: Dict[str, Folder] = {}
+        self._generation: Optional[Tuple[int, int]] = None
+        self._checked_at: Optional[float] = None
+        self._rebuilding: Optional["asyncio.Task[None]"] = None
+        self._refreshed: Optional[List[str]] = None
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        """Return the stat of the folder or file at path, or None if not found."""
+        self._check()
+        folder = self._folders.get(path)
+        if folder is not None:
+            return folder.stat
+        parent = self._folders.get(os.path.dirname(path))
+        if parent is None:
+            return None
+        return parent.files.get(os.path.basename(path))
+
+    def folders(self, path: str) -> List[str]:
+        """Return the names of the sub-folders of path."""
+        self._check()
+        folder = self._folders.get(path)
+        return list(folder.folders) if folder else []
+
+    def build(self) -> None:
+        """Scan the whole data root."""
+        # Set together when done, as the scan may run in a thread of its own:
+        generation = self._read_generation()
+        self._set(_scan(self.data_root), generation)
+
+    def _set(
+        self, folders: Dict[str, Folder], generation: Optional[Tuple[int, int]]
+    ) -> None:
+        self._folders = folders
+        self._generation, self._checked_at = generation, time.monotonic()
+        self.builds += 1
+        logging.debug(f"Indexed {len(self._folders)} folders in {self.data_root}.")
+
+    async def _rebuild(self) -> None:
+        self._refreshed = []
+        try:
+            generation = self._read_generation()
+            folders = await asyncio.to_thread(_scan, self.data_root)
+            refreshed, self._refreshed = self._refreshed, None
+            self._set(folders, generation)
+            # Written by this worker while scanning, which may have missed it:
+            for path in refreshed:
+                self.refresh(path, notify=False)
+        finally:
+            self._refreshed, self._rebuilding = None, None
+
+    def refresh(self, path: str, notify: bool = True) -> None:
+        """Scan path again after it has been written to or removed."""
+        self._check()
+        if self._refreshed is not None:
+            self._refreshed.append(path)
+        # A new folder must be listed in its parent, which may be new as well:
+        parent = os.path.dirname(path)
+        while parent not in self._folders and path.startswith(self.data_root + os.sep):
+            path, parent = parent, os.path.dirname(parent)
+
+        for folder in [
+            f for f in self._folders if f == path or f.startswith(path + os.sep)
+        ]:
+            del self._folders[folder]
+        self._folders.update(_scan(path))
+
+        # The parent folder lists path, unless it has been removed:
+        if parent in self._folders:
+            with contextlib.suppress(FileNotFoundError):
+                self._folders[parent] = self._folders[parent]._replace(
+                    stat=os.stat(parent)
+                )
+            if path in self._folders:
+                self._folders[parent].folders.add(os.path.basename(path))
+            else:
+                self._folders[parent].folders.discard(os.path.basename(path))
+
+        # Not needed for changes that every worker sees for itself:
+        if notify:
+            self._generation = self._write_generation()
+
+    def _check(self) -> None:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < (
+            self.check_interval
+        ):
+            return
+        if self._checked_at is None:
+            self.build()
+        elif self._rebuilding is None and self._read_generation() != self._generation:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Not on the event loop, e.g. in a thread:
+                self.build()
+            else:
+                self._rebuilding = loop.create_task(self._rebuild())
+        self._checked_at = now
+
+    def _read_generation(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.generation_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _write_generation(self) -> Optional[Tuple[int, int]]:
+        # A new file is renamed into place, so that its inode is new as well:
+        folder = os.path.dirname(self.generation_path)
+        os.makedirs(folder, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=folder)
+        os.close(fd)
+        os.replace(temporary_path, self.generation_path)
+        return self._read_generation()
+
+
+def _scan(path: str) -> Dict[str, Folder]:
+    folders: Dict[str, Folder] = {}
+    stack = [path]
+    while stack:
+        folder = stack.pop()
+        try:
+            st = os.stat(folder)
+            entries = list(os.scandir(folder))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        sub_folders: Set[str] = set()
+        files: Dict[str, os.stat_result] = {}
+        for entry in entries:
+            if entry.is_dir():
+                sub_folders.add(entry.name)
+                stack.append(entry.path)
+            else:
+                with contextlib.suppress(FileNotFoundError):
+                    files[entry.name] = entry.stat()
+        folders[folder] = Folder(st, sub_folders, files)
+    return folders
@@ -0,0 +1,215 @@
+"""Module for metrics in the Prometheus text format."""
+
+import bisect
+from collections import defaultdict
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+PREFIX = "static_rdf_server_"
+# Name: (type, help) of every metric:
+METRICS: Dict[str, Tuple[str, str]] = {
+    "requests_total": ("counter", "Requests handled, by route and status."),
+    "request_duration_seconds": (
+        "histogram",
+        "Time spent handling requests, until the response is ready to be sent.",
+    ),
+    "request_bytes_total": ("counter", "Bytes of request bodies received."),
+    "response_bytes_total": ("counter", "Bytes of response bodies with a length."),
+    "rdf_parse_seconds": ("histogram", "Time spent parsing RDF, by format."),
+    "rdf_serialize_seconds": ("histogram", "Time spent serializing RDF, by format."),
+    "upload_parts_total": ("counter", "Parts uploaded, by content-type."),
+    "upload_part_bytes_total": ("counter", "Bytes of parts uploaded."),
+    "cache_hits_total": ("counter", "Lookups found in cache, by cache."),
+    "cache_misses_total": ("counter", "Lookups not found in cache, by cache."),
+    "cache_evictions_total": ("counter", "Entries evicted to make room, by cache."),
+}
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 7.5, 10]
+
+Labels = Tuple[Tuple[str, str], ...]
+Counters = Dict[Tuple[str, Labels], float]
+# Observations per bucket, with +Inf last, and sum of observations:
+Histograms = Dict[Tuple[str, Labels], Tuple[List[int], float]]
+
+
+class Metrics:
+    """Class representing the counters and histograms of one worker.
+
+    With a metrics_dir, every worker writes its metrics to a file of its own
+    in that folder, and the metrics of all workers are added up when
+    collected. The folder should be emptied when the server starts.
+    """
+
+    def __init__(self, metrics_dir: Optional[str] = None) -> None:
+        """Create metrics, shared with other workers through metrics_dir if given."""
+        self.metrics_dir = metrics_dir
+        self._counters: Counters = defaultdict(float)
+        self._histograms: Histograms = {}
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        """Add value to the counter."""
+        self._counters[(name, _labels(name, labels))] += value
+
+    def set_counter(self, name: str, labels: Dict[str, str], value: float) -> None:
+        """Set the counter to value, for counters kept elsewhere."""
+        self._counters[(name, _labels(name, labels))] = value
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        """Add an observation of value to the histogram."""
+        key = (name, _labels(name, labels))
+        counts, total = self._histograms.get(key, ([0] * (len(BUCKETS) + 1), 0.0))
+        counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self._histograms[key] = (counts, total + value)
+
+    def write(self) -> None:
+        """Write the metrics of this worker to its file in metrics_dir."""
+        if not self.metrics_dir:
+            return
+        os.makedirs(self.metrics_dir, exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=self.metrics_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(self._snapshot(), file)
+        os.replace(
+            temporary_path, os.path.join(self.metrics_dir, f"{os.getpid()}.json")
+        )
+
+    def render(self) -> str:
+        """Return the metrics of all workers in the Prometheus text format."""
+        snapshots = [self._snapshot()]
+        if self.metrics_dir:
+            self.write()
+            snapshots = list(_read_snapshots(self.metrics_dir))
+        counters, histograms = _add_up(snapshots)
+
+        lines: List[str] = []
+        for name, (metric_type, help_text) in METRICS.items():
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {metric_type}")
+            for (_name, labels), value in sorted(counters.items()):
+                if _name == name:
+                    lines.append(f"{PREFIX}{name}{_format(labels)} {value}")
+            for (_name, labels), (counts, total) in sorted(histograms.items()):
+                if _name == name:
+                    lines.extend(_histogram_lines(name, labels, counts, total))
+        return "\n".join(lines) + "\n"
+
+    def _snapshot(self) -> Dict[str, List[Any]]:
+        return {
+            "counters": [
+                [name, dict(labels), value]
+                for (name, labels), value in self._counters.items()
+            ],
+            "histograms": [
+                [name, dict(labels), counts, total]
+                for (name, labels), (counts, total) in self._histograms.items()
+            ],
+        }
+
+
+@web.middleware
+async def metrics_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Count the request, and the time it takes to handle it."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        metrics = request.app["METRICS"]
+        route = _route(request)
+        labels = {"route": route, "method": request.method, "status": str(status)}
+        metrics.inc("requests_total", labels)
+        metrics.observe("request_duration_seconds", labels, time.perf_counter() - start)
+        metrics.inc(
+            "request_bytes_total", {"route": route}, request.content_length or 0
+        )
+
+
+async def count_response_bytes(
+    request: web.Request, response: web.StreamResponse
+) -> None:
+    """Count the bytes of the response body, when it is about to be sent."""
+    # Only known here for a file response, and not known for a streamed one:
+    if response.content_length:
+        request.app["METRICS"].inc(
+            "response_bytes_total", {"route": _route(request)}, response.content_length
+        )
+
+
+def _route(request: web.Request) -> str:
+    if request.match_info.http_exception is not None:
+        return "none"
+    return request.match_info.handler.__name__
+
+
+def _labels(name: str, labels: Dict[str, str]) -> Labels:
+    if name not in METRICS:
+        raise KeyError(f"Unknown metric {name}.")
+    return tuple(sorted(labels.items()))
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(
+    name: str, labels: Labels, counts: List[int], total: float
+) -> List[str]:
+    lines: List[str] = []
+    cumulative = 0
+    for bound, count in zip([*BUCKETS, "+Inf"], counts, strict=True):
+        cumulative += count
+        bucket_labels = (*labels, ("le", str(bound)))
+        lines.append(f"{PREFIX}{name}_bucket{_format(bucket_labels)} {cumulative}")
+    lines.append(f"{PREFIX}{name}_sum{_format(labels)} {total}")
+    lines.append(f"{PREFIX}{name}_count{_format(labels)} {cumulative}")
+    return lines
+
+
+def _add_up(
+    snapshots: Iterable[Dict[str, List[Any]]],
+) -> Tuple[Counters, Histograms]:
+    counters: Counters = defaultdict(float)
+    histograms: Histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            counters[(name, _labels(name, labels))] += value
+        for name, labels, counts, total in snapshot["histograms"]:
+            key = (name, _labels(name, labels))
+            previous_counts, previous_total = histograms.get(
+                key, ([0] * len(counts), 0.0)
+            )
+            histograms[key] = (
+                [a + b for a, b in zip(previous_counts, counts, strict=True)],
+                previous_total + total,
+            )
+    return counters, histograms
+
+
+def _read_snapshots(metrics_dir: str) -> Iterable[Dict[str, List[Any]]]:
+    for filename in os.listdir(metrics_dir):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(metrics_dir, filename)) as file:
+                yield json.load(file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read metrics from {filename}: {e}")
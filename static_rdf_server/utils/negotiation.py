@@ -0,0 +1,70 @@
+"""Module for memoized content negotiation."""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from content_negotiation import (
+    decide_content_type,
+    decide_language,
+    NoAgreeableContentTypeError,
+    NoAgreeableLanguageError,
+)
+
+# Distinct combinations of headers and supported values remembered, per worker:
+NEGOTIATION_CACHE_SIZE = 1024
+
+
+def negotiate_content_type(
+    accept_header: List[str], supported_content_types: List[str]
+) -> str:
+    """Return the content-type decided by decide_content_type, from cache if seen."""
+    content_type = _decide_content_type(
+        tuple(accept_header), tuple(supported_content_types)
+    )
+    if content_type is None:
+        raise NoAgreeableContentTypeError()
+    return content_type
+
+
+def negotiate_language(
+    accept_language_header: List[str], supported_languages: List[str]
+) -> str:
+    """Return the language decided by decide_language, from cache if seen."""
+    language = _decide_language(
+        tuple(accept_language_header), tuple(supported_languages)
+    )
+    if language is None:
+        raise NoAgreeableLanguageError()
+    return language
+
+
+def negotiation_stats() -> Dict[str, int]:
+    """Return hits, misses and entries of the negotiation caches."""
+    content_type_info = _decide_content_type.cache_info()
+    language_info = _decide_language.cache_info()
+    return {
+        "hits": content_type_info.hits + language_info.hits,
+        "misses": content_type_info.misses + language_info.misses,
+        "entries": content_type_info.currsize + language_info.currsize,
+    }
+
+
+# Headers that are not acceptable are remembered as None, as they are as common:
+@lru_cache(maxsize=NEGOTIATION_CACHE_SIZE)
+def _decide_content_type(
+    accept_header: Tuple[str, ...], supported_content_types: Tuple[str, ...]
+) -> Optional[str]:
+    try:
+        return decide_content_type(list(accept_header), list(supported_content_types))
+    except NoAgreeableContentTypeError:
+        return None
+
+
+@lru_cache(maxsize=NEGOTIATION_CACHE_SIZE)
+def _decide_language(
+    accept_language_header: Tuple[str, ...], supported_languages: Tuple[str, ...]
+) -> Optional[str]:
+    try:
+        return decide_language(list(accept_language_header), list(supported_languages))
+    except NoAgreeableLanguageError:
+        return None
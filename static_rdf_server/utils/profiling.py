@@ -0,0 +1,96 @@
+"""Module for profiling single requests on demand."""
+
+import asyncio
+import cProfile
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+import uuid
+
+from aiohttp import web
+
+PROFILE_HEADER = "X-Profile"
+T = TypeVar("T")
+
+
+class Profiler:
+    """Class storing cProfile profiles of requests in a folder of bounded size.
+
+    A profiled request sees every coroutine running in the worker meanwhile,
+    and only one profiler can be active at a time, so profiled requests take
+    turns. Conversions in worker processes are profiled to files of their own.
+    """
+
+    def __init__(self, profile_root: str, retention: int) -> None:
+        """Create a profiler keeping the latest retention profiles in profile_root."""
+        self.profile_root = profile_root
+        self.retention = retention
+        self.lock = asyncio.Lock()
+
+    def name(self, route: str) -> str:
+        """Return a new name for a profile of route."""
+        timestamp = time.strftime("%Y%m%dT%H%M%S")
+        return f"{timestamp}-{route}-{uuid.uuid4().hex[:8]}"
+
+    def path(self, name: str) -> str:
+        """Return the path of the profile with name."""
+        os.makedirs(self.profile_root, exist_ok=True)
+        return os.path.join(self.profile_root, f"{name}.prof")
+
+    def save(self, profile: cProfile.Profile, name: str) -> None:
+        """Store the profile, and remove the oldest ones beyond retention."""
+        profile.dump_stats(self.path(name))
+        profiles = sorted(
+            (entry for entry in os.scandir(self.profile_root) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime_ns,
+        )
+        for entry in profiles[: max(len(profiles) - self.retention, 0)]:
+            os.remove(entry.path)
+
+
+def profile_path(request: web.Request, phase: str) -> Optional[str]:
+    """Return a new path for a profile of a phase of the request, if it is profiled."""
+    name: Optional[str] = request.get("PROFILE")
+    if name is None:
+        return None
+    return request.app["PROFILER"].path(f"{name}-{phase}-{uuid.uuid4().hex[:8]}")
+
+
+def run_profiled(path: str, fn: Callable[..., T], *args: Any) -> T:
+    """Run fn with args, and store its profile at path."""
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(fn, *args)
+    finally:
+        profile.dump_stats(path)
+
+
+@web.middleware
+async def profiling_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Profile the request when asked to in the X-Profile header, with the API key."""
+    if request.headers.get(PROFILE_HEADER) != "1":
+        return await handler(request)
+    # Without the API key the header is ignored, and the request served as usual:
+    api_key = request.headers.get("X-API-KEY", None)
+    if not api_key or os.getenv("API_KEY", None) != api_key:
+        return await handler(request)
+
+    profiler = request.app["PROFILER"]
+    async with profiler.lock:
+        name = profiler.name(getattr(request.match_info.handler, "__name__", "none"))
+        request["PROFILE"] = name
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            response = await handler(request)
+        finally:
+            profile.disable()
+            profiler.save(profile, name)
+            logging.info(f"Stored profile {name} of {request.method} {request.path}.")
+    # The name of the profile, so that it can be found among the others:
+    response.headers[PROFILE_HEADER] = name
+    return response
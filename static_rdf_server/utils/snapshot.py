@@ -0,0 +1,444 @@
+"""Module for compact binary snapshots of RDF graphs."""
+
+import array
+import bisect
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    Union,
+)
+
+from static_rdf_server.utils.index import OntologyIndex
+
+if TYPE_CHECKING:  # pragma: no cover
+    from rdflib import Graph
+
+    from static_rdf_server.utils.conversion import Conversion, ConversionEngine
+
+SNAPSHOT_EXTENSION = "snapshot"
+MAGIC = b"RDFSNAP\0"
+VERSION = 2
+# Magic, version, number of terms and number of triples, little-endian:
+_HEADER = struct.Struct("<8sI4xQQ")
+# The triples are stored in three orders, by the positions in each row, so
+# that every triple pattern is a range of rows in one of them:
+_TABLES: Dict[str, Tuple[int, int, int]] = {
+    "spo": (0, 1, 2),
+    "pos": (1, 2, 0),
+    "osp": (2, 0, 1),
+}
+# Characters not allowed as they are in an N-Triples IRI:
+_IRI_ESCAPES = set('<>"{}|^`\\')
+
+# An encoded term, as stored in the snapshot:
+Encoding = bytes
+
+
+class SnapshotFormatException(Exception):
+    """Class representing a snapshot that cannot be written or read."""
+
+    pass
+
+
+class GraphSnapshot:
+    """Class representing a snapshot of a graph, memory-mapped from its file.
+
+    After the header follow the offsets of the terms, the terms themselves and
+    the triples. Every term is stored once, and the terms are sorted by their
+    encoding, so that a term id is its position. The triples are stored as ids
+    three times, sorted (subject, predicate, object), (predicate, object,
+    subject) and (object, subject, predicate). Nothing is decoded before it is
+    asked for.
+    """
+
+    def __init__(self, source: Union[str, bytes]) -> None:
+        """Map the snapshot at path, or read it from bytes, raise if not readable."""
+        name = source if isinstance(source, str) else "Snapshot"
+        self._mmap: Optional[mmap.mmap] = None
+        self._buffer: Union[bytes, mmap.mmap]
+        if isinstance(source, str):
+            with open(source, "rb") as file:
+                try:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError as e:
+                    raise SnapshotFormatException(f"{name} is empty.") from e
+            self._buffer = self._mmap
+        else:
+            self._buffer = source
+        try:
+            self._views: List[memoryview] = []
+            if len(self._buffer) < _HEADER.size:
+                raise SnapshotFormatException(f"{name} is truncated.")
+            magic, version, self.term_count, self.triple_count = _HEADER.unpack_from(
+                self._buffer
+            )
+            if magic != MAGIC:
+                raise SnapshotFormatException(f"{name} is not a snapshot.")
+            if version != VERSION:
+                raise SnapshotFormatException(
+                    f"{name} has version {version}, expected {VERSION}."
+                )
+            offset = _HEADER.size
+            self._offsets = self._array("Q", offset, self.term_count + 1)
+            self._terms_offset = offset + 8 * (self.term_count + 1)
+            offset = _align(self._terms_offset + self._offsets[-1])
+            self._tables: Dict[str, Sequence[int]] = {}
+            for table in _TABLES:
+                self._tables[table] = self._array("I", offset, 3 * self.triple_count)
+                offset += 4 * 3 * self.triple_count
+        except BaseException:
+            self.close()
+            raise
+
+    def _array(
+        self, typecode: Literal["I", "Q"], offset: int, count: int
+    ) -> Sequence[int]:
+        end = offset + array.array(typecode).itemsize * count
+        if end > len(self._buffer):
+            raise SnapshotFormatException("Snapshot is truncated.")
+        view = memoryview(self._buffer)[offset:end]
+        self._views.append(view)
+        if sys.byteorder == "little":
+            values = view.cast(typecode)
+            self._views.append(values)
+            return values
+        swapped = array.array(typecode, view)
+        swapped.byteswap()
+        return swapped
+
+    def __len__(self) -> int:
+        """Return the number of triples."""
+        return self.triple_count
+
+    def __enter__(self) -> "GraphSnapshot":
+        """Return the snapshot."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Unmap the snapshot."""
+        self.close()
+
+    def encoding(self, term_id: int) -> Encoding:
+        """Return the encoding of the term with term_id."""
+        start = self._terms_offset + self._offsets[term_id]
+        end = self._terms_offset + self._offsets[term_id + 1]
+        return bytes(self._buffer[start:end])
+
+    def term(self, term_id: int) -> Any:
+        """Return the term with term_id."""
+        return _decode(self.encoding(term_id))
+
+    def term_id(self, encoding: Encoding) -> Optional[int]:
+        """Return the id of the term with encoding, or None if not in the graph."""
+        term_id = bisect.bisect_left(
+            range(self.term_count), encoding, key=self.encoding
+        )
+        if term_id < self.term_count and self.encoding(term_id) == encoding:
+            return term_id
+        return None
+
+    def triples(self) -> Iterator[Tuple[Any, Any, Any]]:
+        """Return the triples, in (subject, predicate, object) order."""
+        terms = [self.term(term_id) for term_id in range(self.term_count)]
+        ids = self._tables["spo"]
+        for i in range(0, len(ids), 3):
+            yield terms[ids[i]], terms[ids[i + 1]], terms[ids[i + 2]]
+
+    def match(
+        self, pattern: Sequence[Optional[Encoding]], offset: int, limit: int
+    ) -> Tuple[int, List[Tuple[Encoding, Encoding, Encoding]]]:
+        """Return the number of triples matching the pattern, and limit of them.
+
+        Args:
+            pattern: The encoded subject, predicate and object, None for any.
+            offset: The number of matching triples to skip.
+            limit: The maximum number of matching triples to return.
+
+        Returns:
+            The number of matching triples, and the encoded triples from offset.
+        """
+        ids: List[Optional[int]] = []
+        for encoding in pattern:
+            term_id = None if encoding is None else self.term_id(encoding)
+            if encoding is not None and term_id is None:
+                return 0, []
+            ids.append(term_id)
+        bound = {
+            position for position, term_id in enumerate(ids) if term_id is not None
+        }
+        table, order = next(
+            (table, order)
+            for table, order in _TABLES.items()
+            if set(order[: len(bound)]) == bound
+        )
+        prefix = tuple(ids[position] for position in order[: len(bound)])
+
+        # Matching rows are next to each other, and found by binary search:
+        rows = _Rows(self._tables[table])
+        start = bisect.bisect_left(rows, prefix, key=lambda row: row[: len(prefix)])
+        end = bisect.bisect_right(rows, prefix, key=lambda row: row[: len(prefix)])
+        triples: List[Tuple[Encoding, Encoding, Encoding]] = []
+        for i in range(start + offset, min(end, start + offset + limit)):
+            triple = dict(zip(order, rows[i], strict=True))
+            triples.append(
+                (
+                    self.encoding(triple[0]),
+                    self.encoding(triple[1]),
+                    self.encoding(triple[2]),
+                )
+            )
+        return end - start, triples
+
+    def graph(self) -> "Graph":
+        """Return the snapshot as a graph."""
+        from rdflib import Graph
+
+        graph = Graph()
+        graph.addN((s, p, o, graph) for s, p, o in self.triples())
+        return graph
+
+    def close(self) -> None:
+        """Unmap the snapshot."""
+        # The mmap cannot be closed while a view of it is in use:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+def dump_graph(graph: "Graph") -> bytes:
+    """Return the snapshot of graph."""
+    encoded: Dict[Any, bytes] = {}
+    for triple in graph:
+        for term in triple:
+            if term not in encoded:
+                encoded[term] = _encode(term)
+    encodings = sorted(set(encoded.values()))
+    if len(encodings) >= 2**32:
+        raise SnapshotFormatException(f"Too many terms: {len(encodings)}.")
+    term_ids = {encoding: term_id for term_id, encoding in enumerate(encodings)}
+
+    offsets = array.array("Q", [0])
+    for encoding in encodings:
+        offsets.append(offsets[-1] + len(encoding))
+    triples = [
+        (term_ids[encoded[s]], term_ids[encoded[p]], term_ids[encoded[o]])
+        for s, p, o in graph
+    ]
+    tables: List[array.array] = []
+    for order in _TABLES.values():
+        table = array.array("I")
+        for row in sorted(tuple(triple[i] for i in order) for triple in triples):
+            table.extend(row)
+        tables.append(table)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        for table in tables:
+            table.byteswap()
+
+    header = _HEADER.pack(MAGIC, VERSION, len(encodings), len(triples))
+    blob = b"".join(encodings)
+    padding = bytes(_align(len(blob)) - len(blob))
+    return b"".join(
+        [header, offsets.tobytes(), blob, padding]
+        + [table.tobytes() for table in tables]
+    )
+
+
+def load_graph(path: str) -> "Graph":
+    """Return the graph in the snapshot at path."""
+    with GraphSnapshot(path) as snapshot:
+        return snapshot.graph()
+
+
+def snapshot_path(path: str) -> str:
+    """Return the path of the snapshot of the turtle file at path."""
+    return f"{os.path.splitext(path)[0]}.{SNAPSHOT_EXTENSION}"
+
+
+def fresh_snapshot(index: OntologyIndex, path: str) -> Optional[str]:
+    """Return the path of the snapshot of the turtle file, if it is up to date."""
+    # The snapshot is written after the turtle file, a later change to the
+    # turtle file, e.g. made outside the server, makes the snapshot stale:
+    st = index.stat(path)
+    st_snapshot = index.stat(snapshot_path(path))
+    if st is None or st_snapshot is None or st_snapshot.st_mtime_ns < st.st_mtime_ns:
+        return None
+    return snapshot_path(path)
+
+
+def store_snapshot(path: str, snapshot: bytes, st: os.stat_result) -> str:
+    """Write the snapshot of the turtle file at path, as it was when st was taken."""
+    # Renamed into place, with the mtime of the turtle file it was made from,
+    # so that it is stale at once if the turtle file has been changed since:
+    fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(snapshot)
+        os.utime(temporary_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(temporary_path, snapshot_path(path))
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return snapshot_path(path)
+
+
+async def convert_stored(
+    conversion_engine: "ConversionEngine",
+    index: OntologyIndex,
+    path: str,
+    content_types: List[str],
+    profile_path: Optional[str] = None,
+) -> "Conversion":
+    """Return the turtle file at path converted, from its snapshot if up to date."""
+    # Loading the snapshot stored at upload is faster than parsing turtle:
+    snapshot = fresh_snapshot(index, path)
+    if snapshot:
+        try:
+            return await conversion_engine.convert_snapshot(
+                snapshot, content_types, profile_path
+            )
+        except (OSError, SnapshotFormatException) as e:
+            # E.g. written by an older version of the server:
+            logging.warning(f"Parsing {path}, could not load snapshot: {e}")
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    read_seconds = time.perf_counter() - start
+    conversion = await conversion_engine.convert(
+        data, "text/turtle", content_types, profile_path
+    )
+    return conversion._replace(read_seconds=read_seconds)
+
+
+def parse_term(value: str) -> Optional[Encoding]:
+    """Return the encoding of a term in a triple pattern, or None if a variable.
+
+    Args:
+        value: An IRI, a blank node, or a literal quoted as in N-Triples but
+            not escaped, followed by an optional language or datatype.
+
+    Returns:
+        The encoding of the term, or None for an empty value or a variable.
+
+    Raises:
+        ValueError: If value is a literal that is not well-formed.
+    """
+    if not value or value.startswith("?"):
+        return None
+    if value.startswith("_:"):
+        return b"B" + value[2:].encode("utf-8")
+    if not value.startswith('"'):
+        return b"U" + value.removeprefix("<").removesuffix(">").encode("utf-8")
+    end = value.rfind('"')
+    if end == 0:
+        raise ValueError(f"Literal {value} is not terminated.")
+    after = end + 1
+    lexical, suffix = value[1:end], value[after:]
+    language, datatype = "", ""
+    if suffix.startswith("@"):
+        language = suffix[1:]
+    elif suffix.startswith("^^"):
+        datatype = suffix[2:].removeprefix("<").removesuffix(">")
+    elif suffix:
+        raise ValueError(f"Literal {value} is not well-formed.")
+    return b"\0".join(
+        [
+            b"L" + language.encode("utf-8"),
+            datatype.encode("utf-8"),
+            lexical.encode("utf-8", "surrogatepass"),
+        ]
+    )
+
+
+def ntriples_term(encoding: Encoding) -> str:
+    """Return the term with encoding written as in N-Triples."""
+    kind, value = encoding[:1], encoding[1:].decode("utf-8", "surrogatepass")
+    if kind == b"U":
+        escaped = "".join(
+            f"\\u{ord(c):04X}" if c in _IRI_ESCAPES or ord(c) <= 0x20 else c
+            for c in value
+        )
+        return f"<{escaped}>"
+    if kind == b"B":
+        return f"_:{value}"
+    language, datatype, lexical = value.split("\0", 2)
+    literal = (
+        lexical.replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    if language:
+        return f'"{literal}"@{language}'
+    if datatype:
+        return f'"{literal}"^^<{datatype}>'
+    return f'"{literal}"'
+
+
+class _Rows:
+    # The rows of a table of ids, as tuples:
+    def __init__(self, ids: Sequence[int]) -> None:
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids) // 3
+
+    def __getitem__(self, row: int) -> Tuple[int, int, int]:
+        ids, i = self._ids, 3 * row
+        return ids[i], ids[i + 1], ids[i + 2]
+
+
+def _align(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def _encode(term: Any) -> bytes:
+    from rdflib import BNode, Literal, URIRef
+
+    if isinstance(term, Literal):
+        # Neither language nor datatype contain NUL, the lexical form goes last:
+        return b"\0".join(
+            [
+                b"L" + (term.language or "").encode("utf-8"),
+                (term.datatype or "").encode("utf-8"),
+                str(term).encode("utf-8", "surrogatepass"),
+            ]
+        )
+    if isinstance(term, BNode):
+        return b"B" + term.encode("utf-8")
+    if isinstance(term, URIRef):
+        return b"U" + term.encode("utf-8")
+    raise SnapshotFormatException(f"Term not supported: {term!r}.")
+
+
+def _decode(data: bytes) -> Any:
+    from rdflib import BNode, Literal, URIRef
+
+    kind, value = data[:1], data[1:]
+    if kind == b"U":
+        return URIRef(value.decode("utf-8"))
+    if kind == b"B":
+        return BNode(value.decode("utf-8"))
+    language, datatype, lexical = value.split(b"\0", 2)
+    return Literal(
+        lexical.decode("utf-8", "surrogatepass"),
+        lang=language.decode("utf-8") or None,
+        datatype=URIRef(datatype.decode("utf-8")) if datatype else None,
+    )
@@ -0,0 +1,65 @@
+"""Module for the Server-Timing header."""
+
+import contextlib
+import time
+from typing import Awaitable, Callable, Dict, Iterator, Optional
+
+from aiohttp import web
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+class ServerTiming:
+    """Class representing the time spent in each phase of a request."""
+
+    def __init__(self) -> None:
+        """Create an empty set of phases."""
+        self.durations: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add seconds to the phase, as a phase may happen more than once."""
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def header(self) -> str:
+        """Return the phases as the value of a Server-Timing header."""
+        return ", ".join(
+            f"{phase};dur={seconds * 1000:.3f}"
+            for phase, seconds in self.durations.items()
+        )
+
+
+def add_timing(request: web.Request, phase: str, seconds: float) -> None:
+    """Add seconds measured elsewhere to the phase, if the request is timed."""
+    server_timing: Optional[ServerTiming] = request.get("SERVER_TIMING")
+    if server_timing is not None:
+        server_timing.add(phase, seconds)
+
+
+@contextlib.contextmanager
+def timing(request: web.Request, phase: str) -> Iterator[None]:
+    """Add the time spent in the block to the phase, if the request is timed."""
+    server_timing: Optional[ServerTiming] = request.get("SERVER_TIMING")
+    if server_timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        server_timing.add(phase, time.perf_counter() - start)
+
+
+@web.middleware
+async def server_timing_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Time the phases of the request, and send them in a Server-Timing header."""
+    server_timing = ServerTiming()
+    request["SERVER_TIMING"] = server_timing
+    start = time.perf_counter()
+    response = await handler(request)
+    # A file response is sent after this, so the time to send it is not included:
+    server_timing.add("total", time.perf_counter() - start)
+    response.headers[SERVER_TIMING_HEADER] = server_timing.header()
+    return response
@@ -0,0 +1,65 @@
+"""Module for removing deleted ontologies in the background."""
+
+import asyncio
+import contextlib
+import logging
+import os
+import shutil
+import uuid
+
+
+class Trash:
+    """Class representing a folder that deleted folders are moved into.
+
+    A folder is moved into the trash with a rename, which returns at once,
+    and reclaimed by the reaper task at a bounded rate of files per second,
+    so that removing a large ontology does not block the event loop or
+    saturate the disk.
+    """
+
+    def __init__(self, trash_root: str, removal_rate: int) -> None:
+        """Create a trash in trash_root, removing removal_rate files per second."""
+        self.trash_root = trash_root
+        self.removal_rate = removal_rate
+        self._not_empty = asyncio.Event()
+
+    def move(self, path: str) -> str:
+        """Move path into the trash and return its path in the trash."""
+        os.makedirs(self.trash_root, exist_ok=True)
+        trash_path = os.path.join(self.trash_root, uuid.uuid4().hex)
+        os.rename(path, trash_path)
+        self._not_empty.set()
+        logging.debug(f"Moved {path} to {trash_path}.")
+        return trash_path
+
+    async def empty(self) -> None:
+        """Remove everything in the trash, including leftovers from earlier runs."""
+        if not os.path.exists(self.trash_root):
+            return
+        for name in os.listdir(self.trash_root):
+            await self._remove(os.path.join(self.trash_root, name))
+
+    async def reap(self) -> None:
+        """Empty the trash at startup, and then every time something is moved in."""
+        while True:
+            self._not_empty.clear()
+            try:
+                await self.empty()
+            except OSError as e:
+                logging.error(f"Could not empty the trash: {e}")
+            await self._not_empty.wait()
+
+    async def _remove(self, path: str) -> None:
+        # Other workers may be removing the same folder, so files may be gone:
+        if not os.path.isdir(path):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            return
+        tree = await asyncio.to_thread(lambda: list(os.walk(path, topdown=False)))
+        for folder, _, filenames in tree:
+            for filename in filenames:
+                with contextlib.suppress(FileNotFoundError):
+                    await asyncio.to_thread(os.remove, os.path.join(folder, filename))
+                await asyncio.sleep(1 / self.removal_rate)
+        await asyncio.to_thread(shutil.rmtree, path, ignore_errors=True)
+        logging.debug(f"Removed {path} from trash.")
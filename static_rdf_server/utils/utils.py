@@ -1,23 +1,47 @@
 """Module for util functions."""
 
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+import gzip
 import logging
-from typing import Any, List, Optional, Tuple
-
-from content_negotiation import (
-    decide_content_type,
-    decide_language,
-    NoAgreeableContentTypeError,
-    NoAgreeableLanguageError,
-)
-from pathvalidate import Platform, validate_filename, validate_filepath, ValidationError
-from rdflib import Graph
-from rdflib.exceptions import ParserError
+import os
+import re
+import string
+import sys
+from typing import Dict, List, Optional, Tuple
+import zlib
+
+from aiohttp import hdrs, web
+import brotli
+from content_negotiation import NoAgreeableContentTypeError, NoAgreeableLanguageError
+from multidict import CIMultiDict
 
 from static_rdf_server.utils.config import (
     EXTENSION_MAP,
     SUPPORTED_CONTENT_TYPES,
     SUPPORTED_EXTENSIONS,
 )
+from static_rdf_server.utils.negotiation import (
+    negotiate_content_type,
+    negotiate_language,
+)
+
+# Max sizes in bytes, and characters not allowed, on Linux:
+FILESYSTEM_ENCODING = sys.getfilesystemencoding()
+FILEPATH_MAX_SIZE = 4096
+FILENAME_MAX_SIZE = 255
+_UNPRINTABLE_CHARACTERS = "".join(
+    chr(c) for c in range(128) if chr(c) not in string.printable
+)
+_INVALID_PATH_CHARACTERS = re.compile(f"[{re.escape(_UNPRINTABLE_CHARACTERS)}]")
+_INVALID_FILENAME_CHARACTERS = re.compile(f"[{re.escape(_UNPRINTABLE_CHARACTERS)}/]")
+_UNC_PREFIXES = {"//", "/\\", "\\/", "\\\\"}
+# The same types, ontologies and versions are validated over and over again:
+PATH_CACHE_SIZE = 4096
+# Moderate levels, as every file of an upload is compressed before the response.
+# Brotli's default quality of 11 is about 100 times slower than gzip -9:
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
 
 
 class ContentTypeNotSupportedException(Exception):
@@ -26,12 +50,6 @@ class ContentTypeNotSupportedException(Exception):
     pass
 
 
-class NotValidFileContentException(Exception):
-    """Class representing the not valid file content exception."""
-
-    pass
-
-
 async def decide_content_and_extension(
     accept_header: List[str],
     supported_content_types: List[str],
@@ -46,7 +64,7 @@ async def decide_content_and_extension(
 
     # Decide content-type:
     try:
-        content_type = decide_content_type(accept_header, supported_content_types)
+        content_type = negotiate_content_type(accept_header, supported_content_types)
         extension = EXTENSION_MAP[content_type]
     except NoAgreeableContentTypeError as e:
         raise ContentTypeNotSupportedException(
@@ -55,7 +73,9 @@ async def decide_content_and_extension(
 
     # Decide content-language:
     try:
-        content_language = decide_language(accept_language_header, supported_languages)
+        content_language = negotiate_language(
+            accept_language_header, supported_languages
+        )
     except NoAgreeableLanguageError:
         # content-language should be the default language:
         content_language = supported_languages[0]
@@ -63,15 +83,87 @@ async def decide_content_and_extension(
     return (content_type, content_language, extension)
 
 
-async def valid_file_content(
-    content_type: str, rdf_content_types: List[str], file_content: Any
-) -> None:
-    """Return True if file-content is valid."""
-    if content_type in rdf_content_types:
-        try:
-            Graph().parse(data=file_content, format=content_type)
-        except (ParserError, SyntaxError, UnicodeDecodeError) as e:
-            raise NotValidFileContentException(str(e)) from e
+def representation_headers(
+    st: os.stat_result,
+    content_type: str,
+    content_language: str,
+    content_encoding: Optional[str] = None,
+    negotiated: bool = True,
+) -> CIMultiDict:
+    """Return validator and Vary headers of the representation stored as st."""
+    # The same file may be sent as more than one representation:
+    variant = zlib.crc32(
+        f"{content_type};{content_language};{content_encoding}".encode("utf-8")
+    )
+    headers = CIMultiDict(
+        [
+            (hdrs.ETAG, f'"{st.st_mtime_ns:x}-{st.st_size:x}-{variant:x}"'),
+            (hdrs.LAST_MODIFIED, formatdate(st.st_mtime, usegmt=True)),
+            (
+                hdrs.VARY,
+                # A URL with an extension gives the same representation to all:
+                (
+                    f"{hdrs.ACCEPT}, {hdrs.ACCEPT_LANGUAGE}, {hdrs.ACCEPT_ENCODING}"
+                    if negotiated
+                    else hdrs.ACCEPT_ENCODING
+                ),
+            ),
+            (hdrs.CONTENT_LANGUAGE, content_language),
+        ]
+    )
+    if content_encoding:
+        headers[hdrs.CONTENT_ENCODING] = content_encoding
+    return headers
+
+
+def is_precondition_failed(request: web.Request, headers: CIMultiDict) -> bool:
+    """Return True if the conditional headers say the client has another representation."""
+    if (etags := request.if_match) is not None:
+        etag = headers[hdrs.ETAG].strip('"')
+        return not any(e.value in (etag, "*") and not e.is_weak for e in etags)
+    if (if_unmodified_since := request.if_unmodified_since) is not None:
+        last_modified = parsedate_to_datetime(headers[hdrs.LAST_MODIFIED])
+        return last_modified > if_unmodified_since
+    return False
+
+
+def is_not_modified(request: web.Request, headers: CIMultiDict) -> bool:
+    """Return True if the conditional headers say the client has the representation."""
+    if (etags := request.if_none_match) is not None:
+        etag = headers[hdrs.ETAG].strip('"')
+        return any(e.value in (etag, "*") for e in etags)
+    if (if_modified_since := request.if_modified_since) is not None:
+        last_modified = parsedate_to_datetime(headers[hdrs.LAST_MODIFIED])
+        return last_modified <= if_modified_since
+    return False
+
+
+def decide_content_encodings(
+    accept_encoding: str, content_codings: List[str]
+) -> List[str]:
+    """Return the acceptable of the given content-codings, best first."""
+    qualities: Dict[str, float] = {}
+    for coding in accept_encoding.lower().split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        if parameters.strip().startswith("q="):
+            try:
+                quality = float(parameters.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip()] = quality
+    acceptable = [
+        c for c in content_codings if qualities.get(c, qualities.get("*", 0.0)) > 0
+    ]
+    return sorted(acceptable, key=lambda c: -qualities.get(c, qualities.get("*", 0.0)))
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """Return data compressed with every content-coding, by content-coding."""
+    return {
+        "gzip": gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0),
+        "br": brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY),
+    }
 
 
 async def valid_file_extension(file_extension: str) -> bool:
@@ -106,21 +198,36 @@ async def rewrite_links(
     return html_str.encode("utf-8")
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def valid_filepath(path: str) -> bool:
-    """Validate filepath."""
-    try:
-        validate_filepath(path, Platform.LINUX)
+    """Validate filepath, as validate_filepath of pathvalidate for Linux."""
+    # Only a path starting like a Windows drive needs the full validation:
+    if path[1:2] == ":" or path[:2] in _UNC_PREFIXES:
+        # Imported here, as such paths are rare:
+        from pathvalidate import Platform, validate_filepath, ValidationError
+
+        try:
+            validate_filepath(path, Platform.LINUX)
+        except ValidationError as e:
+            logging.debug(f"Filepath {path} is invalid: {e}")
+            return False
         return True
-    except ValidationError as e:
-        logging.debug(f"Filepath {path} is invalid: {e}")
+    if not path or len(path.encode(FILESYSTEM_ENCODING)) > FILEPATH_MAX_SIZE:
+        logging.debug(f"Filepath {path} is invalid: length.")
         return False
+    if _INVALID_PATH_CHARACTERS.search(path):
+        logging.debug(f"Filepath {path} is invalid: characters.")
+        return False
+    return True
 
 
+@lru_cache(maxsize=PATH_CACHE_SIZE)
 def valid_filename(filename: str) -> bool:
-    """Validate filename."""
-    try:
-        validate_filename(filename, Platform.LINUX)
-        return True
-    except ValidationError as e:
-        logging.debug(f"Filename {filename} is invalid: {e}")
+    """Validate filename, as validate_filename of pathvalidate for Linux."""
+    if not filename or len(filename.encode(FILESYSTEM_ENCODING)) > FILENAME_MAX_SIZE:
+        logging.debug(f"Filename {filename} is invalid: length.")
+        return False
+    if _INVALID_FILENAME_CHARACTERS.search(filename):
+        logging.debug(f"Filename {filename} is invalid: characters.")
         return False
+    return True
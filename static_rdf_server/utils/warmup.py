@@ -0,0 +1,135 @@
+"""Module for warming up the caches of a worker at startup."""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from static_rdf_server.utils.cache import RepresentationCache
+from static_rdf_server.utils.config import EXTENSION_MAP, RDF_CONTENT_TYPES
+from static_rdf_server.utils.conversion import (
+    ConversionEngine,
+    ConversionTimeoutException,
+    NotValidFileContentException,
+)
+from static_rdf_server.utils.index import OntologyIndex
+from static_rdf_server.utils.snapshot import convert_stored
+
+# Progress is logged every this many ontologies:
+PROGRESS_INTERVAL = 100
+
+# (ontology_type, ontology, version):
+OntologyKey = Tuple[str, str, Optional[str]]
+
+
+class Warmup:
+    """Class representing the warmup of the index and the representation cache.
+
+    Every ontology stored as turtle only, without its other serializations,
+    is converted and cached as it would be for a request without
+    Accept-Language. The ontologies are those listed in the hot-set file, or
+    all of them, and the warmup gives up when the budget in seconds is spent.
+    """
+
+    def __init__(
+        self, enabled: bool, budget: float, hot_set_path: Optional[str] = None
+    ) -> None:
+        """Create a warmup, done at once if not enabled."""
+        self.budget = budget
+        self.hot_set_path = hot_set_path
+        self.done = not enabled
+        self.total = 0
+        self.warmed = 0
+
+    async def run(
+        self,
+        index: OntologyIndex,
+        cache: RepresentationCache,
+        conversion_engine: ConversionEngine,
+    ) -> None:
+        """Build the index and fill the cache, within the budget."""
+        if self.done:
+            return
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.budget):
+                # Off the event loop, which serves /ready in the meantime:
+                await asyncio.to_thread(index.build)
+                ontologies = list(self._ontologies(index))
+                self.total = len(ontologies)
+                logging.info(f"Warming up {self.total} ontologies.")
+                for ontology_key in ontologies:
+                    # Warming up more would evict what has been warmed up:
+                    if cache.size >= cache.max_size:
+                        logging.info("Warmup stopped, the cache is full.")
+                        break
+                    try:
+                        await self._warm(index, cache, conversion_engine, ontology_key)
+                    except (
+                        ConversionTimeoutException,
+                        NotValidFileContentException,
+                        OSError,
+                    ) as e:
+                        logging.warning(f"Could not warm up {ontology_key}: {e}")
+                    self.warmed += 1
+                    if self.warmed % PROGRESS_INTERVAL == 0:
+                        logging.info(f"Warmed up {self.warmed}/{self.total}.")
+        except TimeoutError:
+            logging.warning(f"Warmup gave up after {self.budget} seconds.")
+        finally:
+            self.done = True
+        logging.info(
+            f"Warmed up {self.warmed}/{self.total} ontologies "
+            f"in {time.monotonic() - start:.1f} seconds."
+        )
+
+    def _ontologies(self, index: OntologyIndex) -> Iterator[OntologyKey]:
+        if self.hot_set_path:
+            with open(self.hot_set_path) as file:
+                for line in file:
+                    parts = line.strip().strip("/").split("/")
+                    if 2 <= len(parts) <= 3:
+                        yield (parts[0], parts[1], parts[2] if parts[2:] else None)
+            return
+        for ontology_type in index.folders(index.data_root):
+            type_path = os.path.join(index.data_root, ontology_type)
+            for ontology in index.folders(type_path):
+                yield (ontology_type, ontology, None)
+                # Sub-folders of an ontology are either versions, files or images:
+                ontology_path = os.path.join(type_path, ontology)
+                for version in index.folders(ontology_path):
+                    yield (ontology_type, ontology, version)
+
+    async def _warm(
+        self,
+        index: OntologyIndex,
+        cache: RepresentationCache,
+        conversion_engine: ConversionEngine,
+        ontology_key: OntologyKey,
+    ) -> None:
+        ontology_type, ontology, version = ontology_key
+        folder = os.path.join(index.data_root, *filter(None, ontology_key))
+        path = os.path.join(folder, f"{ontology}.ttl")
+        st = index.stat(path)
+        if st is None:
+            return
+        # Serializations stored next to the turtle file are sent as they are:
+        content_types: List[str] = [
+            content_type
+            for content_type in RDF_CONTENT_TYPES
+            if content_type != "text/turtle"
+            and index.stat(
+                os.path.join(folder, f"{ontology}.{EXTENSION_MAP[content_type]}")
+            )
+            is None
+        ]
+        if not content_types:
+            return
+
+        conversion = await convert_stored(conversion_engine, index, path, content_types)
+        validator = (st.st_mtime_ns, st.st_size)
+        for content_type, body in conversion.serializations.items():
+            if cache.size + len(body) <= cache.max_size:
+                key = (ontology_type, ontology, version, content_type)
+                cache.put(key, validator, body)
@@ -0,0 +1,263 @@
+"""Module for watching the data root for changes made outside the server."""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from static_rdf_server.utils.cache import RepresentationCache
+from static_rdf_server.utils.index import OntologyIndex
+
+# From inotify(7):
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+# A burst of changes is handed over at the latest after this many delays:
+COALESCE_MAX_DELAYS = 10
+
+# (ontology_type, ontology, version), None where the whole level is affected:
+Affected = Tuple[Optional[str], Optional[str], Optional[str]]
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+class Watcher:
+    """Class watching a folder for changes, with inotify or else by polling.
+
+    Changed paths are collected until the folder has been quiet for
+    coalesce_delay seconds, and then handed to on_change all at once. Under
+    gunicorn every worker runs a watcher of its own, so that every worker sees
+    every change.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        on_change: Callable[[Set[str]], Awaitable[None]],
+        coalesce_delay: float,
+        poll_interval: float,
+        inotify: bool = True,
+    ) -> None:
+        """Create a watcher of root, started by watch."""
+        self.root = root
+        self.on_change = on_change
+        self.coalesce_delay = coalesce_delay
+        self.poll_interval = poll_interval
+        self.inotify = inotify
+        self._changes: Set[str] = set()
+        self._changed = asyncio.Event()
+
+    async def watch(self) -> None:
+        """Watch root, and hand over the changes, until cancelled."""
+        os.makedirs(self.root, exist_ok=True)
+        handing_over = asyncio.create_task(self._hand_over())
+        try:
+            if self.inotify:
+                try:
+                    inotify = _Inotify()
+                except OSError as e:
+                    # E.g. not on Linux, or out of inotify instances:
+                    logging.warning(f"Watching {self.root} by polling: {e}")
+                else:
+                    try:
+                        await self._watch_inotify(inotify)
+                    finally:
+                        inotify.close()
+            await self._watch_polling()
+        finally:
+            handing_over.cancel()
+
+    def _add_change(self, path: str) -> None:
+        self._changes.add(path)
+        self._changed.set()
+
+    async def _hand_over(self) -> None:
+        while True:
+            await self._changed.wait()
+            # Wait for the burst to end, e.g. a whole ontology being restored:
+            deadline = time.monotonic() + self.coalesce_delay * COALESCE_MAX_DELAYS
+            while time.monotonic() < deadline:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), self.coalesce_delay)
+                except asyncio.TimeoutError:
+                    break
+            self._changed.clear()
+            changes, self._changes = self._changes, set()
+            logging.debug(f"Changed outside the server: {sorted(changes)}.")
+            try:
+                await self.on_change(changes)
+            except OSError as e:
+                logging.error(f"Could not handle changes: {e}")
+
+    async def _watch_inotify(self, inotify: "_Inotify") -> None:
+        inotify.add_tree(self.root)
+        readable = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_reader(inotify.fd, readable.set)
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                for path, mask in inotify.read():
+                    if mask & IN_Q_OVERFLOW:
+                        # Events were lost, so everything may have changed:
+                        self._add_change(self.root)
+                    elif mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        inotify.add_tree(path)
+                        self._add_change(path)
+                    elif path == self.root and mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                        # The root has been replaced, watch the new one:
+                        os.makedirs(self.root, exist_ok=True)
+                        inotify.add_tree(self.root)
+                        self._add_change(self.root)
+                    elif not mask & IN_IGNORED:
+                        self._add_change(path)
+        finally:
+            loop.remove_reader(inotify.fd)
+
+    async def _watch_polling(self) -> None:
+        snapshot = await asyncio.to_thread(_snapshot, self.root)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            previous, snapshot = snapshot, await asyncio.to_thread(_snapshot, self.root)
+            for path in previous.keys() | snapshot.keys():
+                if previous.get(path) != snapshot.get(path):
+                    self._add_change(path)
+
+
+def affected_ontologies(root: str, paths: Set[str]) -> Set[Affected]:
+    """Return the ontology-types, ontologies and versions the paths belong to."""
+    affected: Set[Affected] = set()
+    for path in paths:
+        parts = os.path.relpath(path, root).split(os.sep)
+        if parts[0] in [".", ".."]:
+            affected.add((None, None, None))
+        elif len(parts) == 1:
+            affected.add((parts[0], None, None))
+        # A path below an ontology is either its file or below a version, files
+        # or images folder. A removed version looks like a file, the whole
+        # ontology is affected then:
+        elif len(parts) == 2 or (len(parts) == 3 and not os.path.isdir(path)):
+            affected.add((parts[0], parts[1], None))
+        else:
+            affected.add((parts[0], parts[1], parts[2]))
+    return affected
+
+
+async def invalidate(
+    index: OntologyIndex, cache: RepresentationCache, paths: Set[str]
+) -> None:
+    """Update the index and cache with the changes to paths in the data root."""
+    # Every worker watches for itself, so the other workers are not notified:
+    for ontology_type, ontology, version in affected_ontologies(index.data_root, paths):
+        if ontology_type is None:
+            # The whole data root is scanned off the event loop:
+            await asyncio.to_thread(index.build)
+            cache.clear()
+            continue
+        path = os.path.join(
+            index.data_root, *filter(None, [ontology_type, ontology, version])
+        )
+        index.refresh(path, notify=False)
+        cache.invalidate(ontology_type, ontology, version)
+        logging.info(f"Invalidated {path}, changed outside the server.")
+
+
+def _snapshot(root: str) -> Snapshot:
+    snapshot: Snapshot = {}
+    for folder, _, filenames in os.walk(root):
+        # The mtime of a folder changes with its files, which are seen anyway:
+        snapshot[folder] = (0, 0)
+        for filename in filenames:
+            path = os.path.join(folder, filename)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+class _Inotify:
+    def __init__(self) -> None:
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (AttributeError, OSError, TypeError) as e:
+            raise OSError(f"inotify is not available: {e}") from e
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._paths: Dict[int, str] = {}
+
+    def add_tree(self, path: str) -> None:
+        # A folder that cannot be watched, e.g. removed meanwhile or one too
+        # many for fs.inotify.max_user_watches, is skipped, not the others:
+        failed: List[str] = []
+        for folder, _, _ in os.walk(path):
+            wd = self._libc.inotify_add_watch(
+                self.fd, os.fsencode(folder), ctypes.c_uint32(WATCH_MASK)
+            )
+            if wd < 0:
+                failed.append(f"{folder}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._paths[wd] = folder
+        if failed:
+            logging.warning(
+                f"Could not watch {len(failed)} folders, changes to them are not "
+                f"seen, e.g. {failed[0]}."
+            )
+
+    def read(self) -> Set[Tuple[str, int]]:
+        events: Set[Tuple[str, int]] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 2**16)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                end = offset + length
+                name = os.fsdecode(data[offset:end].rstrip(b"\0"))
+                offset = end
+                if mask & IN_Q_OVERFLOW:
+                    events.add(("", mask))
+                    continue
+                folder = self._paths.get(wd)
+                if folder is None:
+                    continue
+                events.add((os.path.join(folder, name) if name else folder, mask))
+                if mask & IN_IGNORED:
+                    del self._paths[wd]
+
+    def close(self) -> None:
+        os.close(self.fd)
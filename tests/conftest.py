@@ -1,18 +1,21 @@
 """Conftest module."""
 
+from concurrent.futures import ThreadPoolExecutor
 import os
 from os import environ as env
 import shutil
 import time
-from typing import Any
+from typing import Any, Dict
 
 from aiohttp.test_utils import TestClient as _TestClient
 from dotenv import load_dotenv
+from pyfakefs.fake_filesystem_unittest import Patcher
 import pytest
 import requests
 from requests.exceptions import ConnectionError
 
 from static_rdf_server import create_app
+from static_rdf_server.utils.conversion import ConversionEngine
 
 load_dotenv()
 HOST_PORT = int(env.get("HOST_PORT", "8080"))
@@ -27,6 +30,31 @@ def docker_compose_command() -> str:
     return "docker-compose"
 
 
+class ThreadExecutor(ThreadPoolExecutor):
+    """Thread pool in place of the process pool, with no processes to stop."""
+
+    _processes: Dict[int, Any] = {}
+
+
+@pytest.fixture(autouse=True)
+def conversion_threads(request: Any, monkeypatch: Any) -> None:
+    """Convert in threads in tests with the fake filesystem, unseen by a process."""
+    # Set before any other fixture, which may create the app:
+    if "fs" in request.fixturenames:
+        monkeypatch.setattr(
+            ConversionEngine,
+            "_create_executor",
+            lambda self: ThreadExecutor(max_workers=self.max_workers),
+        )
+
+
+@pytest.fixture
+def fs() -> Any:
+    """Fake filesystem."""
+    with Patcher() as patcher:
+        yield patcher.fs
+
+
 @pytest.fixture
 async def client(aiohttp_client: Any) -> _TestClient:
     """Instantiate server and start it."""
@@ -14,6 +14,10 @@ async def test_delete_ontology(client: Any, fs: Any) -> None:
         "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
         contents=contents,
     )
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.jsonld",
+        contents=contents,
+    )
     fs.create_file(
         "/srv/www/static-rdf-server/static/ontology-type-1/ontology-1/ontology-1.static",
         contents=contents,
@@ -24,6 +28,14 @@ async def test_delete_ontology(client: Any, fs: Any) -> None:
     response = await client.delete("/ontology-type-1/ontology-1", headers=headers)
 
     assert response.status == 204
+    assert not os.path.exists(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1"
+    )
+    assert not os.path.exists(
+        "/srv/www/static-rdf-server/static/ontology-type-1/ontology-1"
+    )
+    await client.app["TRASH"].empty()
+    assert os.listdir("/srv/www/static-rdf-server/trash") == []
 
 
 @pytest.mark.integration
@@ -0,0 +1,106 @@
+"""Integration test cases for the triple pattern fragments route."""
+
+from typing import Any
+
+from aiohttp import hdrs
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import Namespace
+from yarl import URL
+
+from static_rdf_server import app as server
+from static_rdf_server.utils.snapshot import dump_graph
+
+HYDRA = Namespace("http://www.w3.org/ns/hydra/core#")
+TURTLE = """
+<http://example.com/drewp> <http://example.com/says> "Hello"@en .
+<http://example.com/drewp> <http://example.com/says> "Hei"@nb .
+<http://example.com/drewp> <http://example.com/knows> <http://example.com/tim> .
+"""
+
+
+@pytest.mark.integration
+async def test_get_fragment(client: Any, fs: Any) -> None:
+    """Should return the matching triples, with their count and controls."""
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/examples/hello-world/hello-world.ttl",
+        contents=TURTLE,
+    )
+
+    headers = {hdrs.ACCEPT: "text/turtle"}
+    response = await client.get(
+        "/examples/hello-world/fragments",
+        params={"predicate": "http://example.com/says", "object": '"Hei"@nb'},
+        headers=headers,
+    )
+
+    assert response.status == 200
+    assert "text/turtle; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    graph = Graph().parse(data=await response.text(), format="turtle")
+    drewp, says = URIRef("http://example.com/drewp"), URIRef("http://example.com/says")
+    assert {*graph.triples((None, says, None))} == {
+        (drewp, says, Literal("Hei", lang="nb"))
+    }
+    fragment = URIRef(f"{response.url}")
+    assert graph.value(fragment, HYDRA.totalItems) == Literal(1)
+    assert graph.value(fragment, HYDRA.next) is None
+    # Made on the first request, and stored for the next ones:
+    assert fs.exists(
+        "/srv/www/static-rdf-server/data/examples/hello-world/hello-world.snapshot"
+    )
+
+
+@pytest.mark.integration
+async def test_get_fragment_pages(
+    aiohttp_client: Any, monkeypatch: Any, tmp_path: Any
+) -> None:
+    """Should return a page of the snapshot stored at upload, and link the next."""
+    monkeypatch.setattr(server, "DATA_ROOT", str(tmp_path))
+    monkeypatch.setattr(server, "FRAGMENT_PAGE_SIZE", 2)
+    client = await aiohttp_client(await server.create_app())
+    ontology_path = tmp_path / "examples" / "hello-world" / "1.0.0"
+    ontology_path.mkdir(parents=True)
+    (ontology_path / "hello-world.ttl").write_text(TURTLE)
+    graph = Graph().parse(data=TURTLE, format="turtle")
+    (ontology_path / "hello-world.snapshot").write_bytes(dump_graph(graph))
+
+    triples = set()
+    url = client.make_url("/examples/hello-world/1.0.0/fragments?subject=")
+    for page in [1, 2]:
+        response = await client.get(url.relative())
+        assert response.status == 200
+        page_graph = Graph().parse(data=await response.text(), format="turtle")
+        triples |= {
+            *page_graph.triples((URIRef("http://example.com/drewp"), None, None))
+        }
+        fragment = URIRef(f"{response.url}")
+        assert page_graph.value(fragment, HYDRA.totalItems) == Literal(3)
+        if page == 1:
+            next_page = page_graph.value(fragment, HYDRA.next)
+            assert next_page is not None
+            url = URL(str(next_page))
+    assert page_graph.value(fragment, HYDRA.next) is None
+    assert triples == {*graph}
+
+
+@pytest.mark.integration
+async def test_get_fragment_page_not_valid(client: Any, fs: Any) -> None:
+    """Should return status 400."""
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/examples/hello-world/hello-world.ttl",
+        contents=TURTLE,
+    )
+
+    response = await client.get("/examples/hello-world/fragments?page=0")
+
+    assert response.status == 400
+
+
+@pytest.mark.integration
+async def test_get_fragment_ontology_does_not_exist(client: Any, fs: Any) -> None:
+    """Should return status 404."""
+    fs.create_dir("/srv/www/static-rdf-server/data/examples")
+
+    response = await client.get("/examples/hello-world/fragments")
+
+    assert response.status == 404
@@ -1,5 +1,6 @@
 """Test cases for the server module."""
 
+import gzip
 from typing import Any
 
 from aiohttp import hdrs
@@ -7,6 +8,8 @@ import pytest
 from rdflib import Graph
 from rdflib.compare import graph_diff, isomorphic
 
+from static_rdf_server import app as server
+
 
 @pytest.mark.integration
 async def test_get_rdf_turtle(client: Any, fs: Any) -> None:
@@ -34,6 +37,100 @@ async def test_get_rdf_turtle(client: Any, fs: Any) -> None:
     assert _isomorphic, "graphs are not isomorphic"
 
 
+@pytest.mark.integration
+async def test_get_rdf_turtle_as_stored(client: Any, fs: Any) -> None:
+    """Should return status 200 OK and the stored turtle file unchanged."""
+    contents = (
+        "@prefix ex: <http://example.com/> .\n\n"
+        '# A comment that a re-serialization would drop\nex:drewp ex:says "Hello World" .\n'
+    )
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents=contents,
+    )
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.ACCEPT_LANGUAGE: "en"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+
+    assert response.status == 200
+    assert "text/turtle; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    assert "en" == response.headers[hdrs.CONTENT_LANGUAGE]
+    text = await response.text()
+    assert text == contents
+
+
+@pytest.mark.integration
+async def test_get_rdf_turtle_gzip(client: Any, fs: Any) -> None:
+    """Should return status 200 OK and the precompressed turtle file."""
+    contents = b'<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    path = "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl"
+    fs.create_file(path, contents=contents)
+    fs.create_file(f"{path}.gz", contents=gzip.compress(contents))
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.ACCEPT_ENCODING: "gzip"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+
+    assert response.status == 200
+    assert "text/turtle; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    assert "gzip" == response.headers[hdrs.CONTENT_ENCODING]
+    assert contents == await response.read()
+    etag = response.headers[hdrs.ETAG]
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.ACCEPT_ENCODING: "identity"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+
+    assert response.status == 200
+    assert hdrs.CONTENT_ENCODING not in response.headers
+    assert contents == await response.read()
+    assert etag != response.headers[hdrs.ETAG]
+
+
+@pytest.mark.integration
+async def test_get_rdf_turtle_gzip_not_acceptable(client: Any, fs: Any) -> None:
+    """Should return status 200 OK and the turtle file, not the precompressed one."""
+    contents = b'<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    path = "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl"
+    fs.create_file(path, contents=contents)
+    fs.create_file(f"{path}.gz", contents=gzip.compress(contents))
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.ACCEPT_ENCODING: "gzip;q=0"}
+    response = await client.get(
+        "/ontology-type-1/ontology-1", headers=headers, auto_decompress=False
+    )
+
+    assert response.status == 200
+    assert hdrs.CONTENT_ENCODING not in response.headers
+    assert "Accept, Accept-Language, Accept-Encoding" == response.headers[hdrs.VARY]
+    assert contents == await response.read()
+
+
+@pytest.mark.integration
+async def test_get_html_accel_redirect(
+    aiohttp_client: Any, monkeypatch: Any, fs: Any
+) -> None:
+    """Should return the headers of the representation, and leave the file to nginx."""
+    monkeypatch.setattr(server, "ACCEL_REDIRECT_LOCATION", "/internal-data/")
+    client = await aiohttp_client(await server.create_app())
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology 1/ontology 1-en.html",
+        contents="<html>Hello World</html>",
+    )
+
+    headers = {hdrs.ACCEPT: "text/html", hdrs.ACCEPT_LANGUAGE: "en"}
+    response = await client.get("/ontology-type-1/ontology 1", headers=headers)
+
+    assert response.status == 200
+    assert (
+        "/internal-data/ontology-type-1/ontology%201/ontology%201-en.html"
+        == response.headers["X-Accel-Redirect"]
+    )
+    assert "text/html; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    assert "en" == response.headers[hdrs.CONTENT_LANGUAGE]
+    assert hdrs.ETAG in response.headers
+    assert hdrs.ACCEPT_LANGUAGE in response.headers[hdrs.VARY]
+    assert b"" == await response.read()
+
+
 @pytest.mark.integration
 async def test_get_rdf_json_ld(client: Any, fs: Any) -> None:
     """Should return status 200 OK and RDF as turtle."""
@@ -50,6 +147,77 @@ async def test_get_rdf_json_ld(client: Any, fs: Any) -> None:
     assert "application/ld+json; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
 
 
+@pytest.mark.integration
+async def test_get_rdf_n3_from_cache(client: Any, fs: Any) -> None:
+    """Should convert once, and return the cached body on the next request."""
+    contents = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents=contents,
+    )
+
+    headers = {hdrs.ACCEPT: "text/n3"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 200
+    first = await response.text()
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 200
+    second = await response.text()
+
+    assert first == second
+    stats = client.app["REPRESENTATION_CACHE"].stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.integration
+async def test_get_rdf_n3_from_cache_any_language(client: Any, fs: Any) -> None:
+    """Should convert once for every language, as the body does not depend on it."""
+    contents = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents=contents,
+    )
+
+    for language in ["nb", "en"]:
+        headers = {hdrs.ACCEPT: "text/n3", hdrs.ACCEPT_LANGUAGE: language}
+        response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+        assert response.status == 200
+        assert language == response.headers[hdrs.CONTENT_LANGUAGE]
+
+    stats = client.app["REPRESENTATION_CACHE"].stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.integration
+async def test_get_rdf_json_ld_as_stored(client: Any, fs: Any) -> None:
+    """Should return status 200 OK and the stored json-ld file unchanged."""
+    contents_ttl = (
+        '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    )
+    contents_json_ld = (
+        '[{"@id": "http://example.com/drewp",'
+        ' "http://example.com/says": [{"@value": "Hello World"}]}]'
+    )
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents=contents_ttl,
+    )
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.jsonld",
+        contents=contents_json_ld,
+    )
+
+    headers = {hdrs.ACCEPT: "application/ld+json"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+
+    assert response.status == 200
+    assert "application/ld+json; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    text = await response.text()
+    assert text == contents_json_ld
+
+
 @pytest.mark.integration
 async def test_get_html_default_language(client: Any, fs: Any) -> None:
     """Should return status 200 OK and body as html in language nb."""
@@ -543,6 +711,106 @@ async def test_get_html_no_agreeable_language_en(client: Any, fs: Any) -> None:
     assert document == contents_nb
 
 
+@pytest.mark.integration
+async def test_get_rdf_turtle_if_none_match(client: Any, fs: Any) -> None:
+    """Should return status 304 Not Modified when the ETag matches."""
+    contents = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents=contents,
+    )
+
+    headers = {hdrs.ACCEPT: "text/turtle"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 200
+    assert "Accept, Accept-Language, Accept-Encoding" == response.headers[hdrs.VARY]
+    etag = response.headers[hdrs.ETAG]
+    last_modified = response.headers[hdrs.LAST_MODIFIED]
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.IF_NONE_MATCH: etag}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 304
+    assert etag == response.headers[hdrs.ETAG]
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.IF_MODIFIED_SINCE: last_modified}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 304
+
+
+@pytest.mark.integration
+async def test_get_rdf_turtle_if_match(client: Any, fs: Any) -> None:
+    """Should return status 200 OK for the ETag given, else 412 Precondition Failed."""
+    contents = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    path = "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl"
+    fs.create_file(path, contents=contents)
+
+    headers = {hdrs.ACCEPT: "text/turtle"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    etag = response.headers[hdrs.ETAG]
+
+    headers = {hdrs.ACCEPT: "text/turtle", hdrs.IF_MATCH: etag}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 200
+    assert contents == await response.text()
+
+    headers = {hdrs.ACCEPT: "text/n3", hdrs.IF_MATCH: etag}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 412
+
+
+@pytest.mark.integration
+async def test_get_rdf_n3_if_none_match_before_conversion(client: Any, fs: Any) -> None:
+    """Should return status 304 Not Modified without converting the turtle."""
+    contents = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents=contents,
+    )
+
+    response = await client.get(
+        "/ontology-type-1/ontology-1", headers={hdrs.ACCEPT: "text/turtle"}
+    )
+    turtle_etag = response.headers[hdrs.ETAG]
+    response = await client.get(
+        "/ontology-type-1/ontology-1", headers={hdrs.ACCEPT: "text/n3"}
+    )
+    etag = response.headers[hdrs.ETAG]
+    assert etag != turtle_etag
+
+    headers = {hdrs.ACCEPT: "text/n3", hdrs.IF_NONE_MATCH: etag}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 304
+    stats = client.app["REPRESENTATION_CACHE"].stats()
+    assert stats["hits"] + stats["misses"] == 1
+
+
+@pytest.mark.integration
+async def test_get_html_etag_differs_per_language(client: Any, fs: Any) -> None:
+    """Should return different ETags when the same file is sent in two languages."""
+    contents_nb = '<html lang="nb"><p>Hallo, verden!</p></html>'
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1-nb.html",
+        contents=contents_nb,
+    )
+
+    headers = {hdrs.ACCEPT: "text/html", hdrs.ACCEPT_LANGUAGE: "nb"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    etag_nb = response.headers[hdrs.ETAG]
+    headers = {hdrs.ACCEPT: "text/html", hdrs.ACCEPT_LANGUAGE: "nb-NO"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    etag_nb_no = response.headers[hdrs.ETAG]
+
+    assert etag_nb != etag_nb_no
+
+    headers = {
+        hdrs.ACCEPT: "text/html",
+        hdrs.ACCEPT_LANGUAGE: "nb-NO",
+        hdrs.IF_NONE_MATCH: etag_nb,
+    }
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+    assert response.status == 200
+
+
 @pytest.mark.integration
 async def test_get_ontology_with_invalid_path(client: Any, fs: Any) -> None:
     """Should return status 400 when path is invalid."""
@@ -0,0 +1,67 @@
+"""Integration test cases for the serializations addressed by extension."""
+
+from typing import Any
+
+from aiohttp import hdrs
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+DATA_ROOT = "/srv/www/static-rdf-server/data"
+TURTLE = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+
+
+@pytest.mark.integration
+async def test_get_stored_serialization(client: Any, fs: Any) -> None:
+    """Should return the stored file, whatever the Accept header says."""
+    contents = '{"@id": "http://example.com/drewp"}'
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.jsonld", contents=contents)
+
+    headers = {hdrs.ACCEPT: "text/html"}
+    response = await client.get("/type/ontology.jsonld", headers=headers)
+
+    assert response.status == 200
+    assert "application/ld+json; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    assert hdrs.ACCEPT_ENCODING == response.headers[hdrs.VARY]
+    assert contents == await response.text()
+
+
+@pytest.mark.integration
+async def test_get_converted_serialization_of_version(client: Any, fs: Any) -> None:
+    """Should return the turtle file of the version converted to N-Triples."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl", contents=TURTLE)
+
+    response = await client.get("/type/ontology/1.0.0.nt")
+
+    assert response.status == 200
+    assert "application/n-triples" in response.headers[hdrs.CONTENT_TYPE]
+    assert hdrs.ACCEPT_ENCODING == response.headers[hdrs.VARY]
+    g1 = Graph().parse(data=await response.text(), format="nt")
+    g2 = Graph().parse(data=TURTLE, format="turtle")
+    assert isomorphic(g1, g2)
+
+
+@pytest.mark.integration
+async def test_get_ontology_named_with_extension(client: Any, fs: Any) -> None:
+    """Should return the ontology named with the extension, negotiated as before."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology.ttl/ontology.ttl.ttl", contents=TURTLE)
+    fs.create_file(f"{DATA_ROOT}/type/ontology/1.0.nt/ontology.ttl", contents=TURTLE)
+
+    headers = {hdrs.ACCEPT: "text/turtle"}
+    response = await client.get("/type/ontology.ttl", headers=headers)
+    assert response.status == 200
+    assert TURTLE == await response.text()
+    response = await client.get("/type/ontology/1.0.nt", headers=headers)
+    assert response.status == 200
+    assert "text/turtle; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    assert TURTLE == await response.text()
+
+
+@pytest.mark.integration
+async def test_get_serialization_not_found(client: Any, fs: Any) -> None:
+    """Should return 404 Not Found."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology-nb.html", contents="<html/>")
+
+    response = await client.get("/type/ontology.rdf")
+
+    assert response.status == 404
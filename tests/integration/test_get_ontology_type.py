@@ -153,3 +153,76 @@ async def test_get_ontology_type_with_invalid_path(client: Any, fs: Any) -> None
     assert response.status == 400
     body = await response.json()
     assert "Ontology-type path is not valid." == body["detail"]
+
+
+@pytest.mark.integration
+async def test_get_ontology_type_n_quads(
+    client: Any, fs: Any, monkeypatch: Any
+) -> None:
+    """Should return status 200 OK and every ontology in a graph of its own."""
+    from static_rdf_server.routes import ontology_type as ontology_type_route
+
+    # Small chunks, so that the response is written in more than one:
+    monkeypatch.setattr(ontology_type_route, "NQUADS_CHUNK_SIZE", 16)
+    data_root = "/srv/www/static-rdf-server/data/examples"
+    fs.create_file(
+        f"{data_root}/ontology-1/ontology-1.nt",
+        contents=(
+            "# A comment\n"
+            '<http://example.com/drewp> <http://example.com/says> "Hello" .\n'
+            "\n"
+            "<http://example.com/a> <http://example.com/b> <http://example.com/c> .\n"
+        ),
+    )
+    fs.create_file(
+        f"{data_root}/ontology-2/ontology-2.ttl",
+        contents='<http://example.com/drewp> <http://example.com/says> "Hei" .',
+    )
+
+    headers = {hdrs.ACCEPT: "application/n-quads"}
+    response = await client.get("/examples", headers=headers)
+
+    assert response.status == 200
+    assert "application/n-quads; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
+    graph_1 = f"<{client.make_url('/examples/ontology-1')}>"
+    graph_2 = f"<{client.make_url('/examples/ontology-2')}>"
+    assert (await response.text()).splitlines() == [
+        f'<http://example.com/drewp> <http://example.com/says> "Hello" {graph_1} .',
+        "<http://example.com/a> <http://example.com/b> "
+        f"<http://example.com/c> {graph_1} .",
+        f'<http://example.com/drewp> <http://example.com/says> "Hei" {graph_2} .',
+    ]
+
+
+@pytest.mark.integration
+async def test_get_ontology_type_n_quads_blank_nodes(client: Any, fs: Any) -> None:
+    """Should return the blank nodes of each ontology with labels of its own."""
+    data_root = "/srv/www/static-rdf-server/data/examples"
+    for ontology in ["ontology-1", "ontology-2"]:
+        fs.create_file(
+            f"{data_root}/{ontology}/{ontology}.nt",
+            contents='_:b0 <http://example.com/says> "_:b0 says hello" .\n',
+        )
+
+    headers = {hdrs.ACCEPT: "application/n-quads"}
+    response = await client.get("/examples", headers=headers)
+
+    assert response.status == 200
+    graph_1 = f"<{client.make_url('/examples/ontology-1')}>"
+    graph_2 = f"<{client.make_url('/examples/ontology-2')}>"
+    assert (await response.text()).splitlines() == [
+        f'_:g0_b0 <http://example.com/says> "_:b0 says hello" {graph_1} .',
+        f'_:g1_b0 <http://example.com/says> "_:b0 says hello" {graph_2} .',
+    ]
+
+
+@pytest.mark.integration
+async def test_get_ontology_type_html_by_default(client: Any, fs: Any) -> None:
+    """Should return html when the client accepts anything."""
+    fs.create_dir("/srv/www/static-rdf-server/data/examples/ontology-1")
+
+    headers = {hdrs.ACCEPT: "*/*"}
+    response = await client.get("/examples", headers=headers)
+
+    assert response.status == 200
+    assert "text/html; charset=utf-8" == response.headers[hdrs.CONTENT_TYPE]
@@ -0,0 +1,25 @@
+"""Integration test cases for the metrics route."""
+
+from aiohttp.test_utils import TestClient as _TestClient
+import pytest
+
+
+@pytest.mark.integration
+async def test_metrics(client: _TestClient) -> None:
+    """Should return the requests counted, in the Prometheus text format."""
+    await client.get("/ping")
+
+    resp = await client.get("/metrics")
+
+    assert resp.status == 200
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = await resp.text()
+    assert (
+        'static_rdf_server_requests_total{method="GET",route="ping",status="200"} 1.0'
+        in text.splitlines()
+    )
+    assert 'static_rdf_server_cache_hits_total{cache="negotiation"}' in text
+    assert (
+        'static_rdf_server_cache_evictions_total{cache="representation"} 0.0'
+        in text.splitlines()
+    )
@@ -0,0 +1,51 @@
+"""Integration test cases for profiling of requests."""
+
+import os
+from typing import Any
+
+from aiohttp import hdrs
+from aiohttp.test_utils import TestClient as _TestClient
+import pytest
+
+PROFILE_ROOT = "/srv/www/static-rdf-server/profiles"
+
+
+@pytest.mark.integration
+async def test_get_ontology_profiled(client: _TestClient, fs: Any) -> None:
+    """Should store a profile of the request, named in the X-Profile header."""
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents='<http://example.com/drewp> <http://example.com/says> "Hello" .',
+    )
+    headers = {
+        hdrs.ACCEPT: "text/turtle",
+        "X-API-KEY": os.environ["API_KEY"],
+        "X-Profile": "1",
+    }
+
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+
+    assert response.status == 200
+    assert "get_ontology" in response.headers["X-Profile"]
+    assert os.listdir(PROFILE_ROOT) == [f"{response.headers['X-Profile']}.prof"]
+
+
+@pytest.mark.integration
+async def test_profile_without_api_key(client: _TestClient, fs: Any) -> None:
+    """Should return the usual response, and not profile the request."""
+    response = await client.get("/ping", headers={"X-Profile": "1"})
+
+    assert response.status == 200
+    assert "X-Profile" not in response.headers
+    assert not os.path.exists(PROFILE_ROOT)
+
+
+@pytest.mark.integration
+async def test_profile_with_wrong_api_key(client: _TestClient, fs: Any) -> None:
+    """Should return the usual response, and not profile the request."""
+    headers = {"X-Profile": "1", "X-API-KEY": "wrong"}
+    response = await client.get("/ping", headers=headers)
+
+    assert response.status == 200
+    assert "X-Profile" not in response.headers
+    assert not os.path.exists(PROFILE_ROOT)
@@ -1,5 +1,7 @@
 """Test cases for the server module."""
 
+import base64
+import gzip
 import os
 from typing import Any
 
@@ -328,6 +330,171 @@ async def test_put_ontology_xml_when_ontology_does_exist(client: Any, fs: Any) -
     assert hdrs.LOCATION != response.headers
 
 
+@pytest.mark.integration
+async def test_put_ontology_n_triples(client: Any, fs: Any) -> None:
+    """Should return status 201 Created, and store the N-Triples as turtle."""
+    data_root = "/srv/www/static-rdf-server/data"
+    fs.create_dir(f"{data_root}/examples")
+    rdf_content = b'<http://example.com/drewp> <http://example.com/says> "Hello" .\n'
+
+    with MultipartWriter("mixed") as mpwriter:
+        p = mpwriter.append(rdf_content)
+        p.set_content_disposition(
+            "attachment", name="ontology-rdf-file", filename="hello-world.nt"
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "application/n-triples"
+
+    headers = {
+        "X-API-KEY": os.getenv("API_KEY", None),
+    }
+    response = await client.put("/examples/hello-world", headers=headers, data=mpwriter)
+
+    assert response.status == 201
+    assert os.path.exists(f"{data_root}/examples/hello-world/hello-world.ttl")
+    with open(f"{data_root}/examples/hello-world/hello-world.nt", "rb") as file:
+        assert rdf_content == file.read()
+
+
+@pytest.mark.integration
+async def test_put_ontology_stores_all_rdf_serializations(client: Any, fs: Any) -> None:
+    """Should return status 201 Created and store every RDF serialization."""
+    data_root = "/srv/www/static-rdf-server/data"
+    ontology_type = "examples"
+    ontology = "hello-world"
+
+    fs.create_dir(f"{data_root}/{ontology_type}")
+
+    rdf_content = (
+        b'<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+    )
+
+    with MultipartWriter("mixed") as mpwriter:
+        p = mpwriter.append(rdf_content)
+        p.set_content_disposition(
+            "attachment",
+            name="ontology-rdf-file",
+            filename=f"{ontology}.ttl",
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "text/turtle"
+
+    headers = {
+        "X-API-KEY": os.getenv("API_KEY", None),
+    }
+    response = await client.put(
+        f"/{ontology_type}/{ontology}", headers=headers, data=mpwriter
+    )
+
+    assert response.status == 201
+    ontology_path = f"{data_root}/{ontology_type}/{ontology}"
+    for extension in ["ttl", "rdf", "jsonld", "n3"]:
+        assert os.path.exists(f"{ontology_path}/{ontology}.{extension}")
+    with open(f"{ontology_path}/{ontology}.ttl", "rb") as file:
+        assert file.read() == rdf_content
+    with open(f"{ontology_path}/{ontology}.ttl.gz", "rb") as file:
+        assert gzip.decompress(file.read()) == rdf_content
+    for extension in ["rdf", "jsonld", "n3"]:
+        assert os.path.exists(f"{ontology_path}/{ontology}.{extension}.gz")
+    # The graph snapshot, written after the turtle file:
+    snapshot_path = f"{ontology_path}/{ontology}.snapshot"
+    with open(snapshot_path, "rb") as file:
+        assert file.read(8) == b"RDFSNAP\0"
+    st, st_snapshot = os.stat(f"{ontology_path}/{ontology}.ttl"), os.stat(snapshot_path)
+    assert st_snapshot.st_mtime_ns >= st.st_mtime_ns
+
+
+@pytest.mark.integration
+async def test_put_ontology_keeps_previous_version_when_part_not_valid(
+    client: Any, fs: Any
+) -> None:
+    """Should return status 400 Bad Request and leave the published files as is."""
+    server_root = "/srv/www/static-rdf-server"
+    data_root = f"{server_root}/data"
+    ontology_type = "examples"
+    ontology = "hello-world"
+    ontology_path = f"{data_root}/{ontology_type}/{ontology}"
+
+    previous_content = b'<http://example.com/drewp> <http://example.com/says> "Hi" .'
+    fs.create_file(f"{ontology_path}/{ontology}.ttl", contents=previous_content)
+
+    with MultipartWriter("mixed") as mpwriter:
+        p = mpwriter.append(
+            b'<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+        )
+        p.set_content_disposition(
+            "attachment",
+            name="ontology-rdf-file",
+            filename=f"{ontology}.ttl",
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "text/turtle"
+        p = mpwriter.append(b"no rdf content here")
+        p.set_content_disposition(
+            "attachment",
+            name="ontology-rdf-file",
+            filename=f"{ontology}.n3",
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "text/n3"
+
+    headers = {
+        "X-API-KEY": os.getenv("API_KEY", None),
+    }
+    response = await client.put(
+        f"/{ontology_type}/{ontology}", headers=headers, data=mpwriter
+    )
+
+    assert response.status == 400
+    assert os.listdir(ontology_path) == [f"{ontology}.ttl"]
+    with open(f"{ontology_path}/{ontology}.ttl", "rb") as file:
+        assert file.read() == previous_content
+    assert os.listdir(f"{server_root}/staging") == []
+
+
+@pytest.mark.integration
+async def test_put_ontology_streams_static_file(client: Any, fs: Any) -> None:
+    """Should store a static file larger than a chunk unchanged."""
+    data_root = "/srv/www/static-rdf-server/data"
+    static_root = "/srv/www/static-rdf-server/static"
+    ontology_type = "examples"
+    ontology = "hello-world"
+
+    fs.create_dir(f"{data_root}/{ontology_type}")
+
+    pdf_content = os.urandom(300 * 1024)
+    png_content = b"not really a png"
+
+    with MultipartWriter("mixed") as mpwriter:
+        p = mpwriter.append(pdf_content)
+        p.set_content_disposition(
+            "attachment",
+            name="ontology-pdf-file",
+            filename=f"files/{ontology}.pdf",
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "application/pdf"
+        p = mpwriter.append(base64.b64encode(png_content))
+        p.set_content_disposition(
+            "attachment",
+            name="ontology-png-file",
+            filename=f"images/{ontology}.png",
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "image/png"
+        p.headers[hdrs.CONTENT_TRANSFER_ENCODING] = "base64"
+
+    headers = {
+        "X-API-KEY": os.getenv("API_KEY", None),
+    }
+    response = await client.put(
+        f"/{ontology_type}/{ontology}", headers=headers, data=mpwriter
+    )
+
+    assert response.status == 201
+    files_path = f"{static_root}/{ontology_type}/{ontology}/files"
+    assert os.listdir(files_path) == [f"{ontology}.pdf"]
+    with open(f"{files_path}/{ontology}.pdf", "rb") as file:
+        assert file.read() == pdf_content
+    images_path = f"{static_root}/{ontology_type}/{ontology}/images"
+    with open(f"{images_path}/{ontology}.png", "rb") as file:
+        assert file.read() == png_content
+
+
 @pytest.mark.integration
 async def test_put_ontology_when_ontology_type_does_not_exist(
     client: Any, fs: Any
@@ -938,3 +1105,28 @@ async def test_put_ontology_when_filename_is_invalid(client: Any, fs: Any) -> No
     assert response.status == 400
     body = await response.json()
     assert "Ontology file is not valid." == body["detail"]
+
+
+@pytest.mark.integration
+async def test_put_ontology_version_named_fragments(client: Any, fs: Any) -> None:
+    """Should return status 400, as the URL is taken by the fragments."""
+    fs.create_dir("/srv/www/static-rdf-server/data/examples")
+
+    with MultipartWriter("mixed") as mpwriter:
+        p = mpwriter.append(
+            b'<http://example.com/drewp> <http://example.com/says> "Hi" .'
+        )
+        p.set_content_disposition(
+            "attachment", name="ontology-rdf-file", filename="hello-world.ttl"
+        )
+        p.headers[hdrs.CONTENT_TYPE] = "text/turtle"
+
+    headers = {
+        "X-API-KEY": os.getenv("API_KEY", None),
+    }
+    response = await client.put(
+        "/examples/hello-world/fragments", headers=headers, data=mpwriter
+    )
+
+    assert response.status == 400
+    assert not os.path.exists("/srv/www/static-rdf-server/data/examples/hello-world")
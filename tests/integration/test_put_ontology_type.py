@@ -68,3 +68,19 @@ async def test_put_ontology_type_invalid_type(client: Any, fs: Any) -> None:
     response = await client.put("/\0.txt", headers=headers)
 
     assert response.status == 400
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("ontology_type", ["metrics", "ping", "ready"])
+async def test_put_ontology_type_reserved(
+    client: Any, fs: Any, ontology_type: str
+) -> None:
+    """Should return status 400 Bad Request for the name of a route."""
+    headers = {
+        "X-API-KEY": os.getenv("API_KEY", None),
+    }
+
+    response = await client.put(f"/{ontology_type}", headers=headers)
+
+    assert response.status == 400
+    assert not os.path.exists(f"/srv/www/static-rdf-server/data/{ontology_type}")
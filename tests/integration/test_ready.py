@@ -27,3 +27,16 @@ async def test_ready_when_data_root_does_not_exist(
     assert resp.status == 500
     body = await resp.json()
     assert f'Ready fails: SERVER_ROOT "{SERVER_ROOT}" does not exist.' in body["detail"]
+
+
+@pytest.mark.integration
+async def test_ready_when_warming_up(client: _TestClient, fs: Any) -> None:
+    """Should return 503 Service Unavailable until the warmup is done."""
+    fs.create_dir(SERVER_ROOT)
+    client.app["WARMUP"].done = False
+
+    resp = await client.get("/ready")
+
+    assert resp.status == 503
+    body = await resp.json()
+    assert "Warming up: 0/0 ontologies." in body["detail"]
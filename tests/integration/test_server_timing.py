@@ -0,0 +1,81 @@
+"""Integration test cases for the Server-Timing header."""
+
+import asyncio
+from typing import Any, List
+
+from aiohttp import hdrs
+from aiohttp.test_utils import TestClient as _TestClient
+import pytest
+
+from static_rdf_server import app as server
+from static_rdf_server.routes import ontology as ontology_route
+from static_rdf_server.utils.conversion import Conversion
+
+
+@pytest.mark.integration
+async def test_get_ontology_server_timing(
+    aiohttp_client: Any, monkeypatch: Any, fs: Any
+) -> None:
+    """Should return the phases of the request in the Server-Timing header."""
+    monkeypatch.setattr(server, "SERVER_TIMING", True)
+    client = await aiohttp_client(await server.create_app())
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents='<http://example.com/drewp> <http://example.com/says> "Hello" .',
+    )
+
+    headers = {hdrs.ACCEPT: "application/rdf+xml"}
+    response = await client.get("/ontology-type-1/ontology-1", headers=headers)
+
+    assert response.status == 200
+    phases = [
+        metric.split(";")[0] for metric in response.headers["Server-Timing"].split(", ")
+    ]
+    for phase in ["validate", "lookup", "negotiate", "read", "parse", "serialize"]:
+        assert phase in phases
+    assert phases[-1] == "total"
+
+
+@pytest.mark.integration
+async def test_get_ontology_server_timing_shared_conversion(
+    aiohttp_client: Any, monkeypatch: Any, fs: Any
+) -> None:
+    """Should return the phases of the conversion to every request sharing it."""
+    monkeypatch.setattr(server, "SERVER_TIMING", True)
+    client = await aiohttp_client(await server.create_app())
+    fs.create_file(
+        "/srv/www/static-rdf-server/data/ontology-type-1/ontology-1/ontology-1.ttl",
+        contents='<http://example.com/drewp> <http://example.com/says> "Hello" .',
+    )
+
+    async def convert_stored(*args: Any) -> Conversion:
+        # Long enough for the other request to join:
+        await asyncio.sleep(0.1)
+        content_type = "application/rdf+xml"
+        return Conversion({content_type: b""}, 1, 0.5, {content_type: 0.25}, 0.125)
+
+    monkeypatch.setattr(ontology_route, "convert_stored", convert_stored)
+    headers = {hdrs.ACCEPT: "application/rdf+xml"}
+    responses = await asyncio.gather(
+        *[client.get("/ontology-type-1/ontology-1", headers=headers) for _ in "12"]
+    )
+
+    assert client.app["SINGLE_FLIGHT"].shared == 1
+    for response in responses:
+        assert response.status == 200
+        metrics: List[str] = response.headers["Server-Timing"].split(", ")
+        for metric in [
+            "read;dur=125.000",
+            "parse;dur=500.000",
+            "serialize;dur=250.000",
+        ]:
+            assert metric in metrics
+
+
+@pytest.mark.integration
+async def test_server_timing_off_by_default(client: _TestClient) -> None:
+    """Should not return a Server-Timing header unless enabled."""
+    response = await client.get("/ping")
+
+    assert response.status == 200
+    assert "Server-Timing" not in response.headers
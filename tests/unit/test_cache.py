@@ -0,0 +1,119 @@
+"""Unit test cases for the cache module."""
+
+import asyncio
+
+import pytest
+
+from static_rdf_server.utils.cache import RepresentationCache, SingleFlight
+
+
+@pytest.mark.unit
+def test_get_returns_cached_body() -> None:
+    """Should return the body and count a hit."""
+    cache = RepresentationCache(max_size=100)
+    key = ("type", "ontology", None, "text/n3")
+    cache.put(key, (1, 2), b"body")
+
+    assert cache.get(key, (1, 2)) == b"body"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["size"] == 4
+
+
+@pytest.mark.unit
+def test_get_with_other_validator_is_miss() -> None:
+    """Should return None when the source has changed."""
+    cache = RepresentationCache(max_size=100)
+    key = ("type", "ontology", None, "text/n3")
+    cache.put(key, (1, 2), b"body")
+
+    assert cache.get(key, (1, 3)) is None
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.unit
+def test_put_evicts_least_recently_used() -> None:
+    """Should evict the least recently used entry when over budget."""
+    cache = RepresentationCache(max_size=10)
+    first = ("type", "first", None, "text/n3")
+    second = ("type", "second", None, "text/n3")
+    third = ("type", "third", None, "text/n3")
+    cache.put(first, None, b"12345")
+    cache.put(second, None, b"12345")
+    cache.get(first, None)
+    cache.put(third, None, b"12345")
+
+    assert cache.get(first, None) == b"12345"
+    assert cache.get(second, None) is None
+    assert cache.get(third, None) == b"12345"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 10
+
+
+@pytest.mark.unit
+def test_put_body_larger_than_cache() -> None:
+    """Should not cache a body larger than the cache."""
+    cache = RepresentationCache(max_size=4)
+    key = ("type", "ontology", None, "text/n3")
+    cache.put(key, None, b"12345")
+
+    assert cache.get(key, None) is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.unit
+def test_invalidate_ontology() -> None:
+    """Should remove all versions of the ontology, and nothing else."""
+    cache = RepresentationCache(max_size=100)
+    cache.put(("type", "ontology", None, "text/n3"), None, b"1")
+    cache.put(("type", "ontology", "v1", "text/n3"), None, b"2")
+    cache.put(("type", "other", None, "text/n3"), None, b"3")
+
+    assert cache.invalidate("type", "ontology", "v1") == 1
+    assert cache.invalidate("type", "ontology") == 1
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["size"] == 1
+
+
+@pytest.mark.unit
+async def test_single_flight_shares_result() -> None:
+    """Should compute once for concurrent callers with the same key."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def compute() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"body"
+
+    results = await asyncio.gather(
+        *[single_flight.run("key", compute) for _ in range(10)]
+    )
+
+    assert results == [b"body"] * 10
+    assert calls == 1
+    assert single_flight.shared == 9
+
+
+@pytest.mark.unit
+async def test_single_flight_error_is_not_kept() -> None:
+    """Should raise the error to every concurrent caller, and compute again later."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def compute() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise ValueError("failed")
+        return b"body"
+
+    results = await asyncio.gather(
+        *[single_flight.run("key", compute) for _ in range(3)],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await single_flight.run("key", compute) == b"body"
+    assert calls == 2
@@ -0,0 +1,90 @@
+"""Unit test cases for the conversion module."""
+
+from pathlib import Path
+import time
+from typing import AsyncGenerator
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from static_rdf_server.utils.conversion import (
+    ConversionEngine,
+    ConversionTimeoutException,
+    NotValidFileContentException,
+)
+from static_rdf_server.utils.snapshot import snapshot_path
+
+TURTLE = b'<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+
+
+@pytest.fixture
+async def conversion_engine() -> AsyncGenerator[ConversionEngine, None]:
+    """Conversion engine with one worker process."""
+    engine = ConversionEngine(max_workers=1, timeout=30)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.mark.unit
+async def test_convert(conversion_engine: ConversionEngine) -> None:
+    """Should return the data in each of the content-types."""
+    conversion = await conversion_engine.convert(
+        TURTLE, "text/turtle", ["application/ld+json", "application/rdf+xml"]
+    )
+    serializations = conversion.serializations
+
+    assert sorted(serializations) == ["application/ld+json", "application/rdf+xml"]
+    g1 = Graph().parse(data=serializations["application/rdf+xml"], format="xml")
+    g2 = Graph().parse(data=TURTLE, format="turtle")
+    assert isomorphic(g1, g2)
+    assert conversion.triples == 1
+
+
+@pytest.mark.unit
+async def test_convert_not_valid(conversion_engine: ConversionEngine) -> None:
+    """Should raise NotValidFileContentException."""
+    with pytest.raises(NotValidFileContentException):
+        await conversion_engine.convert(b"This is not turtle", "text/turtle", [])
+
+
+@pytest.mark.unit
+async def test_convert_timeout() -> None:
+    """Should raise ConversionTimeoutException."""
+    engine = ConversionEngine(max_workers=1, timeout=0.000001)
+    try:
+        with pytest.raises(ConversionTimeoutException):
+            await engine.convert(TURTLE, "text/turtle", ["text/n3"])
+    finally:
+        engine.shutdown()
+
+
+@pytest.mark.unit
+async def test_run_after_timeout(conversion_engine: ConversionEngine) -> None:
+    """Should stop the conversion timed out, and not queue the next behind it."""
+    with pytest.raises(ConversionTimeoutException):
+        await conversion_engine.run(time.sleep, 60, timeout=0.5)
+
+    start = time.perf_counter()
+    assert await conversion_engine.run(pow, 2, 3) == 8
+    assert time.perf_counter() - start < 30
+
+
+@pytest.mark.unit
+async def test_convert_file(tmp_path: Path) -> None:
+    """Should write each serialization and the snapshot, within upload_timeout."""
+    engine = ConversionEngine(max_workers=1, timeout=0.000001, upload_timeout=30)
+    path = str(tmp_path / "ontology.ttl")
+    Path(path).write_bytes(TURTLE)
+    paths = {"application/rdf+xml": str(tmp_path / "ontology.rdf")}
+    try:
+        conversion = await engine.convert_file(path, "text/turtle", paths, None, path)
+    finally:
+        engine.shutdown()
+
+    assert conversion.serializations == {}
+    assert conversion.triples == 1
+    g1 = Graph().parse(paths["application/rdf+xml"], format="xml")
+    g2 = Graph().parse(data=TURTLE, format="turtle")
+    assert isomorphic(g1, g2)
+    assert Path(snapshot_path(path)).stat().st_mtime_ns == Path(path).stat().st_mtime_ns
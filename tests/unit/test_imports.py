@@ -0,0 +1,38 @@
+"""Unit test cases for the modules loaded by a worker."""
+
+import subprocess  # noqa: S404
+import sys
+
+import pytest
+
+
+@pytest.mark.unit
+def test_create_app_does_not_import_rdflib() -> None:
+    """Should leave rdflib and pathvalidate to be imported on first use."""
+    # In a fresh interpreter, as the tests import rdflib themselves:
+    code = (
+        "import sys\n"
+        "from static_rdf_server import create_app\n"
+        "print(' '.join(m for m in ['rdflib', 'pathvalidate'] if m in sys.modules))\n"
+    )
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+
+    assert output.strip() == ""
+
+
+@pytest.mark.unit
+def test_conversion_does_not_import_the_server() -> None:
+    """Should leave aiohttp and the app out of a conversion process."""
+    code = (
+        "import sys\n"
+        "import static_rdf_server.utils.conversion\n"
+        "modules = ['aiohttp', 'rdflib', 'static_rdf_server.app']\n"
+        "print(' '.join(m for m in modules if m in sys.modules))\n"
+    )
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+
+    assert output.strip() == ""
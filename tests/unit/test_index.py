@@ -0,0 +1,81 @@
+"""Unit test cases for the index module."""
+
+import asyncio
+import os
+from typing import Any
+
+import pytest
+
+from static_rdf_server.utils.index import OntologyIndex
+
+SERVER_ROOT = "/srv/www/static-rdf-server"
+DATA_ROOT = f"{SERVER_ROOT}/data"
+GENERATION_PATH = f"{SERVER_ROOT}/index-generation"
+
+
+@pytest.mark.unit
+def test_index_is_built_on_first_use(fs: Any) -> None:
+    """Should return folders and files as found in the data root."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.ttl", contents="12345")
+    fs.create_dir(f"{DATA_ROOT}/type/ontology/1.0.0")
+    index = OntologyIndex(DATA_ROOT, GENERATION_PATH, check_interval=60)
+
+    assert index.folders(DATA_ROOT) == ["type"]
+    assert index.folders(f"{DATA_ROOT}/type/ontology") == ["1.0.0"]
+    st = index.stat(f"{DATA_ROOT}/type/ontology/ontology.ttl")
+    assert st is not None and st.st_size == 5
+    assert index.stat(f"{DATA_ROOT}/type/ontology/ontology.rdf") is None
+    assert index.stat(f"{DATA_ROOT}/type/other") is None
+
+
+@pytest.mark.unit
+def test_refresh_after_write_and_remove(fs: Any) -> None:
+    """Should find what is written, and not what is removed, after refresh."""
+    fs.create_dir(f"{DATA_ROOT}/type")
+    index = OntologyIndex(DATA_ROOT, GENERATION_PATH, check_interval=60)
+    assert index.folders(f"{DATA_ROOT}/type") == []
+
+    fs.create_file(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl")
+    index.refresh(f"{DATA_ROOT}/type/ontology/1.0.0")
+    assert index.folders(f"{DATA_ROOT}/type") == ["ontology"]
+    assert index.stat(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl") is not None
+
+    fs.remove_object(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl")
+    os.rmdir(f"{DATA_ROOT}/type/ontology/1.0.0")
+    index.refresh(f"{DATA_ROOT}/type/ontology/1.0.0")
+    assert index.folders(f"{DATA_ROOT}/type/ontology") == []
+    assert index.stat(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl") is None
+    assert index.builds == 1
+
+
+@pytest.mark.unit
+def test_index_is_rebuilt_after_write_by_other_worker(fs: Any) -> None:
+    """Should rebuild when the generation has been bumped by another index."""
+    fs.create_dir(f"{DATA_ROOT}/type")
+    index = OntologyIndex(DATA_ROOT, GENERATION_PATH, check_interval=0)
+    other_index = OntologyIndex(DATA_ROOT, GENERATION_PATH, check_interval=0)
+    assert index.folders(f"{DATA_ROOT}/type") == []
+
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.ttl")
+    other_index.refresh(f"{DATA_ROOT}/type/ontology")
+
+    assert index.folders(f"{DATA_ROOT}/type") == ["ontology"]
+    assert index.builds == 2
+
+
+@pytest.mark.unit
+async def test_index_is_rebuilt_off_the_event_loop(fs: Any) -> None:
+    """Should use the old index until the rebuild in a thread is done."""
+    fs.create_dir(f"{DATA_ROOT}/type")
+    index = OntologyIndex(DATA_ROOT, GENERATION_PATH, check_interval=0)
+    other_index = OntologyIndex(DATA_ROOT, GENERATION_PATH, check_interval=0)
+    assert index.folders(f"{DATA_ROOT}/type") == []
+
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.ttl")
+    other_index.refresh(f"{DATA_ROOT}/type/ontology")
+
+    assert index.folders(f"{DATA_ROOT}/type") == []
+    async with asyncio.timeout(10):
+        while index.builds < 2:
+            await asyncio.sleep(0.01)
+    assert index.folders(f"{DATA_ROOT}/type") == ["ontology"]
@@ -0,0 +1,61 @@
+"""Unit test cases for the metrics module."""
+
+import os
+from typing import Any
+
+import pytest
+
+from static_rdf_server.utils.metrics import Metrics
+
+
+@pytest.mark.unit
+def test_render_counter_and_histogram() -> None:
+    """Should render counters, and histograms with cumulative buckets."""
+    metrics = Metrics()
+    metrics.inc("upload_parts_total", {"content_type": "text/turtle"})
+    metrics.inc("upload_parts_total", {"content_type": "text/turtle"})
+    metrics.observe("rdf_parse_seconds", {"format": "text/turtle"}, 0.02)
+    metrics.observe("rdf_parse_seconds", {"format": "text/turtle"}, 20)
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE static_rdf_server_upload_parts_total counter" in lines
+    assert (
+        'static_rdf_server_upload_parts_total{content_type="text/turtle"} 2.0' in lines
+    )
+    assert (
+        'static_rdf_server_rdf_parse_seconds_bucket{format="text/turtle",le="0.01"} 0'
+        in lines
+    )
+    assert (
+        'static_rdf_server_rdf_parse_seconds_bucket{format="text/turtle",le="0.025"} 1'
+        in lines
+    )
+    assert (
+        'static_rdf_server_rdf_parse_seconds_bucket{format="text/turtle",le="+Inf"} 2'
+        in lines
+    )
+    assert 'static_rdf_server_rdf_parse_seconds_count{format="text/turtle"} 2' in lines
+
+
+@pytest.mark.unit
+def test_render_adds_up_workers(fs: Any) -> None:
+    """Should add up the metrics written by every worker."""
+    metrics_dir = "/srv/www/static-rdf-server/metrics"
+    other_worker = Metrics(metrics_dir)
+    other_worker.inc("cache_hits_total", {"cache": "representation"}, 3)
+    other_worker.write()
+    os.rename(f"{metrics_dir}/{os.getpid()}.json", f"{metrics_dir}/1.json")
+    metrics = Metrics(metrics_dir)
+    metrics.inc("cache_hits_total", {"cache": "representation"}, 2)
+
+    lines = metrics.render().splitlines()
+
+    assert 'static_rdf_server_cache_hits_total{cache="representation"} 5.0' in lines
+
+
+@pytest.mark.unit
+def test_unknown_metric() -> None:
+    """Should raise KeyError for a metric not declared."""
+    with pytest.raises(KeyError):
+        Metrics().inc("unknown_total", {})
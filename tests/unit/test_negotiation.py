@@ -0,0 +1,42 @@
+"""Unit test cases for the negotiation module."""
+
+from content_negotiation import NoAgreeableContentTypeError, NoAgreeableLanguageError
+import pytest
+
+from static_rdf_server.utils.negotiation import (
+    negotiate_content_type,
+    negotiate_language,
+    negotiation_stats,
+)
+
+
+@pytest.mark.unit
+def test_negotiate_content_type_from_cache() -> None:
+    """Should return the same content-type, and count a hit the second time."""
+    accept_header = ["text/turtle;q=0.5, application/x-negotiation-test"]
+    supported = ["text/html", "text/turtle"]
+    hits = negotiation_stats()["hits"]
+
+    assert negotiate_content_type(accept_header, supported) == "text/turtle"
+    assert negotiate_content_type(accept_header, supported) == "text/turtle"
+    assert negotiation_stats()["hits"] == hits + 1
+
+
+@pytest.mark.unit
+def test_negotiate_content_type_not_acceptable_from_cache() -> None:
+    """Should raise NoAgreeableContentTypeError, also when cached."""
+    accept_header = ["application/x-not-acceptable-test"]
+    hits = negotiation_stats()["hits"]
+
+    for _ in range(2):
+        with pytest.raises(NoAgreeableContentTypeError):
+            negotiate_content_type(accept_header, ["text/html"])
+    assert negotiation_stats()["hits"] == hits + 1
+
+
+@pytest.mark.unit
+def test_negotiate_language_is_keyed_by_supported_languages() -> None:
+    """Should not return a language decided for other supported languages."""
+    assert negotiate_language(["en"], ["nb", "en"]) == "en"
+    with pytest.raises(NoAgreeableLanguageError):
+        negotiate_language(["en"], ["nb", "nn"])
@@ -0,0 +1,38 @@
+"""Unit test cases for the profiling module."""
+
+import cProfile
+import os
+import pstats
+from typing import Any
+
+import pytest
+
+from static_rdf_server.utils.profiling import Profiler, run_profiled
+
+PROFILE_ROOT = "/srv/www/static-rdf-server/profiles"
+
+
+@pytest.mark.unit
+async def test_save_keeps_latest_profiles(fs: Any) -> None:
+    """Should remove the oldest profiles beyond retention."""
+    profiler = Profiler(PROFILE_ROOT, retention=2)
+    names = [profiler.name("get_ontology") for _ in range(3)]
+
+    for i, name in enumerate(names):
+        profiler.save(cProfile.Profile(), name)
+        os.utime(profiler.path(name), ns=(i, i))
+
+    profiler.save(cProfile.Profile(), "latest")
+    assert sorted(os.listdir(PROFILE_ROOT)) == sorted(
+        [f"{names[2]}.prof", "latest.prof"]
+    )
+
+
+@pytest.mark.unit
+def test_run_profiled(tmp_path: Any) -> None:
+    """Should return the result of the function, and store its profile."""
+    path = str(tmp_path / "conversion.prof")
+
+    assert run_profiled(path, sorted, [2, 1]) == [1, 2]
+    functions = pstats.Stats(path).get_stats_profile().func_profiles
+    assert any("sorted" in function for function in functions)
@@ -0,0 +1,38 @@
+"""Unit test cases for publishing staged files."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from static_rdf_server.routes.ontology import publish
+
+
+@pytest.mark.unit
+def test_publish_removes_stale_compressed_files(tmp_path: Path) -> None:
+    """Should replace the files, and remove compressed files of old content."""
+    staged_root, root = tmp_path / "staged", tmp_path / "data"
+    (staged_root / "ontology").mkdir(parents=True)
+    (root / "ontology").mkdir(parents=True)
+    for filename, content in [
+        ("ontology.ttl", b"new"),
+        ("ontology.ttl.gz", b"new gzip"),
+        ("ontology.html", b"new"),
+    ]:
+        (staged_root / "ontology" / filename).write_bytes(content)
+    for filename in ["ontology.ttl", "ontology.ttl.gz", "ontology.ttl.br"]:
+        (root / "ontology" / filename).write_bytes(b"old")
+    for filename in ["ontology.html", "ontology.html.gz", "other.ttl.gz"]:
+        (root / "ontology" / filename).write_bytes(b"old")
+
+    publish(str(staged_root), str(root), remove_stale_compressed=True)
+
+    assert sorted(os.listdir(root / "ontology")) == [
+        "ontology.html",
+        "ontology.ttl",
+        "ontology.ttl.gz",
+        "other.ttl.gz",
+    ]
+    assert (root / "ontology" / "ontology.ttl").read_bytes() == b"new"
+    assert (root / "ontology" / "ontology.ttl.gz").read_bytes() == b"new gzip"
+    assert (root / "ontology" / "ontology.html").read_bytes() == b"new"
@@ -0,0 +1,216 @@
+"""Unit test cases for the snapshot module."""
+
+import glob
+import itertools
+import os
+import struct
+from typing import Any, AsyncGenerator, List, Optional
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import XSD
+from rdflib.term import Node
+
+from static_rdf_server.utils.conversion import ConversionEngine
+from static_rdf_server.utils.index import OntologyIndex
+from static_rdf_server.utils.snapshot import (
+    convert_stored,
+    dump_graph,
+    fresh_snapshot,
+    GraphSnapshot,
+    load_graph,
+    ntriples_term,
+    parse_term,
+    snapshot_path,
+    SnapshotFormatException,
+    store_snapshot,
+)
+
+VOCABULARIES = sorted(glob.glob("tests/files/**/*.ttl", recursive=True))
+
+
+@pytest.fixture
+async def conversion_engine() -> AsyncGenerator[ConversionEngine, None]:
+    """Conversion engine with one worker process."""
+    engine = ConversionEngine(max_workers=1, timeout=30)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", VOCABULARIES)
+def test_round_trip(tmp_path: Any, path: str) -> None:
+    """Should load a graph equivalent to the turtle it was written from."""
+    graph = Graph().parse(path, format="turtle")
+    (tmp_path / "graph.snapshot").write_bytes(dump_graph(graph))
+
+    assert isomorphic(load_graph(str(tmp_path / "graph.snapshot")), graph)
+
+
+@pytest.mark.unit
+def test_round_trip_terms(tmp_path: Any) -> None:
+    """Should keep blank nodes, languages, datatypes and odd lexical forms."""
+    s = URIRef("http://example.com/s")
+    graph = Graph()
+    graph.add((s, URIRef("http://example.com/p"), Literal("Hei", lang="nb")))
+    graph.add((s, URIRef("http://example.com/p"), Literal("1", datatype=XSD.integer)))
+    graph.add((s, URIRef("http://example.com/p"), Literal("a\0b\nc æøå")))
+    graph.add((BNode(), URIRef("http://example.com/p"), s))
+    (tmp_path / "graph.snapshot").write_bytes(dump_graph(graph))
+
+    with GraphSnapshot(str(tmp_path / "graph.snapshot")) as snapshot:
+        assert len(snapshot) == 4
+        assert isomorphic(snapshot.graph(), graph)
+
+
+@pytest.mark.unit
+def test_version_not_supported(tmp_path: Any) -> None:
+    """Should raise SnapshotFormatException for another version of the format."""
+    data = bytearray(dump_graph(Graph()))
+    struct.pack_into("<I", data, 8, 99)
+    (tmp_path / "graph.snapshot").write_bytes(data)
+
+    with pytest.raises(SnapshotFormatException, match="version 99"):
+        GraphSnapshot(str(tmp_path / "graph.snapshot"))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("data", [b"", b"RDFSNAP", b"not a snapshot" * 4])
+def test_not_a_snapshot(tmp_path: Any, data: bytes) -> None:
+    """Should raise SnapshotFormatException for a file that is not a snapshot."""
+    (tmp_path / "graph.snapshot").write_bytes(data)
+
+    with pytest.raises(SnapshotFormatException):
+        GraphSnapshot(str(tmp_path / "graph.snapshot"))
+
+
+@pytest.mark.unit
+async def test_convert_stored(
+    tmp_path: Any, conversion_engine: ConversionEngine
+) -> None:
+    """Should load the snapshot while it is up to date, and else parse turtle."""
+    path = str(tmp_path / "ontology.ttl")
+    with open(path, "w") as file:
+        file.write('<http://example.com/drewp> <http://example.com/says> "Hello" .')
+    graph = Graph().parse(path, format="turtle")
+    with open(snapshot_path(path), "wb") as file:
+        file.write(dump_graph(graph))
+    index = OntologyIndex(str(tmp_path), str(tmp_path / "generation"), 60)
+
+    conversion = await convert_stored(conversion_engine, index, path, ["text/n3"])
+    assert conversion.read_seconds == 0.0
+    assert isomorphic(Graph().parse(data=conversion.serializations["text/n3"]), graph)
+
+    # The turtle file changed after the snapshot was written:
+    st = os.stat(snapshot_path(path))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    index.build()
+    conversion = await convert_stored(conversion_engine, index, path, ["text/n3"])
+    assert conversion.read_seconds > 0.0
+
+
+@pytest.mark.unit
+def test_store_snapshot(tmp_path: Any) -> None:
+    """Should store a snapshot that is up to date until the turtle file changes."""
+    path = str(tmp_path / "ontology.ttl")
+    with open(path, "w") as file:
+        file.write('<http://example.com/drewp> <http://example.com/says> "Hello" .')
+    st = os.stat(path)
+    graph = Graph().parse(path, format="turtle")
+
+    assert store_snapshot(path, dump_graph(graph), st) == snapshot_path(path)
+    assert sorted(os.listdir(tmp_path)) == ["ontology.snapshot", "ontology.ttl"]
+    index = OntologyIndex(str(tmp_path), str(tmp_path / "generation"), 60)
+    assert fresh_snapshot(index, path) == snapshot_path(path)
+
+    # The turtle file changed while the snapshot was made:
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    index.build()
+    assert fresh_snapshot(index, path) is None
+
+
+@pytest.mark.unit
+def test_match(tmp_path: Any) -> None:
+    """Should return the triples matching every pattern, a page at a time."""
+    graph = Graph().parse(
+        "tests/files/input/vocabularies/audience-type/audience-type.ttl"
+    )
+    (tmp_path / "graph.snapshot").write_bytes(dump_graph(graph))
+
+    with GraphSnapshot(str(tmp_path / "graph.snapshot")) as snapshot:
+        for triple in [*graph][:5]:
+            for bound in itertools.product([False, True], repeat=3):
+                s, p, o = (
+                    term if b else None for term, b in zip(triple, bound, strict=True)
+                )
+                pattern: List[Optional[Node]] = [s, p, o]
+                expected = {*graph.triples((s, p, o))}
+                encodings = [
+                    parse_term(term.n3()) if term is not None else None
+                    for term in pattern
+                ]
+
+                count, first = snapshot.match(encodings, 0, 2)
+                _, rest = snapshot.match(encodings, 2, len(graph))
+
+                assert count == len(expected)
+                assert len(first) == min(count, 2)
+                triples = Graph().parse(
+                    data="".join(
+                        " ".join(ntriples_term(term) for term in triple) + " .\n"
+                        for triple in first + rest
+                    ),
+                    format="nt",
+                )
+                assert {*triples} == expected
+
+
+@pytest.mark.unit
+def test_match_term_not_in_graph(tmp_path: Any) -> None:
+    """Should return no triples for a term not in the graph."""
+    graph = Graph()
+    graph.add((URIRef("http://example.com/s"), URIRef("http://example.com/p"), BNode()))
+    (tmp_path / "graph.snapshot").write_bytes(dump_graph(graph))
+
+    with GraphSnapshot(str(tmp_path / "graph.snapshot")) as snapshot:
+        pattern = [None, parse_term("http://example.com/other"), None]
+        assert snapshot.match(pattern, 0, 10) == (0, [])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "value, term",
+    [
+        ("", None),
+        ("?s", None),
+        ("http://example.com/s", URIRef("http://example.com/s")),
+        ("<http://example.com/s>", URIRef("http://example.com/s")),
+        ('"Hei "du""@nb', Literal('Hei "du"', lang="nb")),
+        (
+            f'"1"^^{XSD.integer}',
+            Literal("1", datatype=XSD.integer),
+        ),
+        ('"Hello"', Literal("Hello")),
+    ],
+)
+def test_parse_term(value: str, term: Any) -> None:
+    """Should return the encoding of the term in a triple pattern."""
+    encoding = parse_term(value)
+    assert encoding == (None if term is None else dump_graph_term(term))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", ['"Hello', '"Hello"en'])
+def test_parse_term_not_valid(value: str) -> None:
+    """Should raise ValueError for a literal that is not well-formed."""
+    with pytest.raises(ValueError):
+        parse_term(value)
+
+
+def dump_graph_term(term: Any) -> bytes:
+    """Return the encoding of term, as stored in a snapshot."""
+    graph = Graph()
+    graph.add((URIRef("http://example.com/s"), URIRef("http://example.com/p"), term))
+    with GraphSnapshot(dump_graph(graph)) as snapshot:
+        return snapshot.match([None, None, None], 0, 1)[1][0][2]
@@ -0,0 +1,43 @@
+"""Unit test cases for the trash module."""
+
+import asyncio
+import os
+from typing import Any
+
+import pytest
+
+from static_rdf_server.utils.trash import Trash
+
+TRASH_ROOT = "/srv/www/static-rdf-server/trash"
+
+
+@pytest.mark.unit
+async def test_move_and_empty(fs: Any) -> None:
+    """Should move the folder into the trash, and remove it when emptied."""
+    fs.create_file("/data/type/ontology/ontology.ttl")
+    fs.create_file("/data/type/ontology/images/image.png")
+    trash = Trash(TRASH_ROOT, removal_rate=1000)
+
+    trash_path = trash.move("/data/type/ontology")
+
+    assert not os.path.exists("/data/type/ontology")
+    assert os.path.exists(os.path.join(trash_path, "images", "image.png"))
+    await trash.empty()
+    assert os.listdir(TRASH_ROOT) == []
+
+
+@pytest.mark.unit
+async def test_reap_removes_leftovers(fs: Any) -> None:
+    """Should remove what is left in the trash when started."""
+    fs.create_file(f"{TRASH_ROOT}/leftover/ontology.ttl")
+    trash = Trash(TRASH_ROOT, removal_rate=1000)
+
+    reaper = asyncio.create_task(trash.reap())
+    try:
+        for _ in range(100):
+            if not os.listdir(TRASH_ROOT):
+                break
+            await asyncio.sleep(0.01)
+        assert os.listdir(TRASH_ROOT) == []
+    finally:
+        reaper.cancel()
@@ -2,11 +2,15 @@
 
 from typing import Dict, List
 
+from pathvalidate import Platform, validate_filename, validate_filepath, ValidationError
 import pytest
 
-from static_rdf_server.utils import (
+from static_rdf_server.utils.utils import (
     ContentTypeNotSupportedException,
     decide_content_and_extension,
+    decide_content_encodings,
+    valid_filename,
+    valid_filepath,
 )
 
 # Default is the first in the list:
@@ -145,3 +149,86 @@ async def test_decide_content_type_and_extension_not_supported() -> None:
             accept_language_header,
             SUPPORTED_LANGUAGES,
         )
+
+
+@pytest.mark.unit
+def test_decide_content_encodings_server_preference() -> None:
+    """Should return br before gzip when both are equally acceptable."""
+    content_encodings = decide_content_encodings("gzip, deflate, br", ["br", "gzip"])
+
+    assert content_encodings == ["br", "gzip"]
+
+
+@pytest.mark.unit
+def test_decide_content_encodings_quality() -> None:
+    """Should return by quality, and leave out the not acceptable."""
+    assert decide_content_encodings("br;q=0.5, gzip", ["br", "gzip"]) == [
+        "gzip",
+        "br",
+    ]
+    assert decide_content_encodings("br;q=0, *", ["br", "gzip"]) == ["gzip"]
+
+
+@pytest.mark.unit
+def test_decide_content_encodings_none() -> None:
+    """Should return empty list when no Accept-Encoding is given."""
+    assert decide_content_encodings("", ["br", "gzip"]) == []
+    assert decide_content_encodings("identity", ["br", "gzip"]) == []
+
+
+# Paths valid and not valid to pathvalidate, for Linux:
+PATHS: List[str] = [
+    "/srv/www/static-rdf-server/data/examples/hello-world",
+    "/srv/www/static-rdf-server/data/examples/hello-world/1.0.0",
+    "images",
+    "hello-world-en.html",
+    "",
+    " ",
+    "/",
+    ".",
+    "..",
+    "a/../b",
+    "a\\b",
+    "tab\tand newline\n",
+    "nul\x00",
+    "escape\x1b",
+    "delete\x7f",
+    "C:/Windows",
+    "C:relative",
+    "//server/share/file",
+    "\\\\server\\share\\file",
+    "/C:/path",
+    "/æøå",
+    "x" * 255,
+    "x" * 256,
+    "/" + "x" * 4095,
+    "/" + "x" * 4096,
+    "æ" * 127 + "x",
+    "æ" * 128,
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", PATHS)
+def test_valid_filepath_as_pathvalidate(path: str) -> None:
+    """Should accept and reject the same paths as validate_filepath."""
+    try:
+        validate_filepath(path, Platform.LINUX)
+        expected = True
+    except ValidationError:
+        expected = False
+
+    assert valid_filepath(path) is expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("filename", PATHS)
+def test_valid_filename_as_pathvalidate(filename: str) -> None:
+    """Should accept and reject the same filenames as validate_filename."""
+    try:
+        validate_filename(filename, Platform.LINUX)
+        expected = True
+    except ValidationError:
+        expected = False
+
+    assert valid_filename(filename) is expected
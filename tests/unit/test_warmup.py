@@ -0,0 +1,91 @@
+"""Unit test cases for the warmup module."""
+
+import os
+from typing import Any
+
+import pytest
+
+from static_rdf_server.utils.cache import RepresentationCache
+from static_rdf_server.utils.conversion import ConversionEngine
+from static_rdf_server.utils.index import OntologyIndex
+from static_rdf_server.utils.warmup import Warmup
+
+SERVER_ROOT = "/srv/www/static-rdf-server"
+DATA_ROOT = f"{SERVER_ROOT}/data"
+TURTLE = '<http://example.com/drewp> <http://example.com/says> "Hello World" .'
+
+
+@pytest.mark.unit
+async def test_warmup_caches_ontologies_stored_as_turtle_only(fs: Any) -> None:
+    """Should cache the serializations that are not stored, and be done."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.ttl", contents=TURTLE)
+    fs.create_file(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl", contents=TURTLE)
+    fs.create_file(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.rdf", contents="<rdf/>")
+    index = OntologyIndex(DATA_ROOT, f"{SERVER_ROOT}/index-generation", 60)
+    cache = RepresentationCache(2**20)
+    conversion_engine = ConversionEngine(max_workers=1, timeout=30)
+    warmup = Warmup(enabled=True, budget=60)
+
+    try:
+        await warmup.run(index, cache, conversion_engine)
+    finally:
+        conversion_engine.shutdown()
+
+    assert warmup.done
+    assert (warmup.warmed, warmup.total) == (2, 2)
+    st = os.stat(f"{DATA_ROOT}/type/ontology/ontology.ttl")
+    validator = (st.st_mtime_ns, st.st_size)
+    assert cache.get(("type", "ontology", None, "application/rdf+xml"), validator)
+    st = os.stat(f"{DATA_ROOT}/type/ontology/1.0.0/ontology.ttl")
+    validator = (st.st_mtime_ns, st.st_size)
+    assert cache.get(("type", "ontology", "1.0.0", "text/n3"), validator)
+    assert not cache.get(
+        ("type", "ontology", "1.0.0", "application/rdf+xml"), validator
+    )
+
+
+@pytest.mark.unit
+async def test_warmup_of_hot_set(fs: Any) -> None:
+    """Should only warm up the ontologies listed in the hot-set file."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.ttl", contents=TURTLE)
+    fs.create_file(f"{DATA_ROOT}/type/other/other.ttl", contents=TURTLE)
+    fs.create_file(f"{SERVER_ROOT}/hot-set", contents="type/other\n")
+    index = OntologyIndex(DATA_ROOT, f"{SERVER_ROOT}/index-generation", 60)
+    cache = RepresentationCache(2**20)
+    conversion_engine = ConversionEngine(max_workers=1, timeout=30)
+    warmup = Warmup(enabled=True, budget=60, hot_set_path=f"{SERVER_ROOT}/hot-set")
+
+    try:
+        await warmup.run(index, cache, conversion_engine)
+    finally:
+        conversion_engine.shutdown()
+
+    assert (warmup.warmed, warmup.total) == (1, 1)
+    for ontology, cached in [("ontology", False), ("other", True)]:
+        st = os.stat(f"{DATA_ROOT}/type/{ontology}/{ontology}.ttl")
+        key = ("type", ontology, None, "text/n3")
+        assert bool(cache.get(key, (st.st_mtime_ns, st.st_size))) == cached
+
+
+@pytest.mark.unit
+async def test_warmup_stops_when_cache_is_full(fs: Any) -> None:
+    """Should stop warming up instead of evicting what it has warmed up."""
+    fs.create_file(f"{DATA_ROOT}/type/ontology/ontology.ttl", contents=TURTLE)
+    fs.create_file(f"{DATA_ROOT}/type/other/other.ttl", contents=TURTLE)
+    fs.create_file(f"{SERVER_ROOT}/hot-set", contents="type/other\n")
+    index = OntologyIndex(DATA_ROOT, f"{SERVER_ROOT}/index-generation", 60)
+    conversion_engine = ConversionEngine(max_workers=1, timeout=30)
+    try:
+        # A cache with room for the serializations of one ontology:
+        cache = RepresentationCache(2**20)
+        warmup = Warmup(enabled=True, budget=60, hot_set_path=f"{SERVER_ROOT}/hot-set")
+        await warmup.run(index, cache, conversion_engine)
+        cache = RepresentationCache(cache.size)
+        warmup = Warmup(enabled=True, budget=60)
+        await warmup.run(index, cache, conversion_engine)
+    finally:
+        conversion_engine.shutdown()
+
+    assert (warmup.warmed, warmup.total) == (1, 2)
+    assert cache.size == cache.max_size
+    assert cache.evictions == 0
@@ -0,0 +1,138 @@
+"""Unit test cases for the watcher module."""
+
+import asyncio
+import contextlib
+import os
+from typing import Any, List, Set
+
+import pytest
+
+from static_rdf_server.utils.cache import RepresentationCache
+from static_rdf_server.utils.index import OntologyIndex
+from static_rdf_server.utils.watcher import (
+    _Inotify,
+    affected_ontologies,
+    invalidate,
+    Watcher,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("inotify", [True, False])
+async def test_watch(tmp_path: Any, inotify: bool) -> None:
+    """Should hand over the paths changed, as one burst."""
+    root = str(tmp_path / "data")
+    os.makedirs(f"{root}/type/ontology/1.0.0")
+    changes: List[Set[str]] = []
+
+    async def on_change(paths: Set[str]) -> None:
+        changes.append(paths)
+
+    watcher = Watcher(root, on_change, 0.1, 0.1, inotify=inotify)
+    task = asyncio.create_task(watcher.watch())
+    await asyncio.sleep(0.3)
+
+    with open(f"{root}/type/ontology/ontology.ttl", "w") as file:
+        file.write("<a> <b> <c> .")
+    with open(f"{root}/type/ontology/1.0.0/ontology.ttl", "w") as file:
+        file.write("<a> <b> <c> .")
+    for _ in range(50):
+        if changes:
+            break
+        await asyncio.sleep(0.1)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    assert len(changes) == 1
+    assert affected_ontologies(root, changes[0]) == {
+        ("type", "ontology", None),
+        ("type", "ontology", "1.0.0"),
+    }
+
+
+@pytest.mark.unit
+def test_affected_ontologies(tmp_path: Any) -> None:
+    """Should return the ontology-types, ontologies and versions of the paths."""
+    root = str(tmp_path)
+    os.makedirs(f"{root}/type/ontology/1.0.0")
+    paths = {
+        root,
+        f"{root}/other-type",
+        f"{root}/type/other",
+        f"{root}/type/ontology/1.0.0",
+        f"{root}/type/ontology/files/ontology.pdf",
+        f"{root}/type/removed/2.0.0",
+    }
+
+    assert affected_ontologies(root, paths) == {
+        (None, None, None),
+        ("other-type", None, None),
+        ("type", "other", None),
+        ("type", "ontology", "1.0.0"),
+        ("type", "ontology", "files"),
+        ("type", "removed", None),
+    }
+
+
+@pytest.mark.unit
+async def test_invalidate(tmp_path: Any) -> None:
+    """Should update the index and cache, without notifying other workers."""
+    root = str(tmp_path / "data")
+    generation_path = str(tmp_path / "index-generation")
+    os.makedirs(f"{root}/type/ontology")
+    index = OntologyIndex(root, generation_path, check_interval=60)
+    index.build()
+    cache = RepresentationCache(2**20)
+    key = ("type", "ontology", None, "text/n3")
+    cache.put(key, "validator", b"body")
+
+    with open(f"{root}/type/ontology/ontology.ttl", "w") as file:
+        file.write("<a> <b> <c> .")
+    await invalidate(index, cache, {f"{root}/type/ontology/ontology.ttl"})
+
+    assert index.stat(f"{root}/type/ontology/ontology.ttl") is not None
+    assert cache.get(key, "validator") is None
+    assert not os.path.exists(generation_path)
+
+
+@pytest.mark.unit
+async def test_invalidate_data_root(tmp_path: Any) -> None:
+    """Should build the index again, and clear the cache."""
+    root = str(tmp_path / "data")
+    os.makedirs(f"{root}/type/ontology")
+    index = OntologyIndex(root, str(tmp_path / "index-generation"), check_interval=60)
+    index.build()
+    cache = RepresentationCache(2**20)
+    cache.put(("type", "ontology", None, "text/n3"), "validator", b"body")
+
+    with open(f"{root}/type/ontology/ontology.ttl", "w") as file:
+        file.write("<a> <b> <c> .")
+    await invalidate(index, cache, {root})
+
+    assert index.stat(f"{root}/type/ontology/ontology.ttl") is not None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+def test_inotify_skips_folder_not_watched(tmp_path: Any, monkeypatch: Any) -> None:
+    """Should watch the other folders when a folder cannot be watched."""
+    root = str(tmp_path)
+    os.makedirs(f"{root}/removed")
+    os.makedirs(f"{root}/type")
+    inotify = _Inotify()
+    libc = inotify._libc
+
+    class _Libc:
+        def inotify_add_watch(self, fd: int, path: bytes, mask: Any) -> int:
+            if path.endswith(b"/removed"):
+                return -1
+            return libc.inotify_add_watch(fd, path, mask)
+
+    monkeypatch.setattr(inotify, "_libc", _Libc())
+    try:
+        inotify.add_tree(root)
+    finally:
+        inotify.close()
+
+    assert sorted(inotify._paths.values()) == [root, f"{root}/type"]